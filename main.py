@@ -1,11 +1,15 @@
 import sys
+import threading
 from PySide6.QtWidgets import QApplication
 from ui.main_window import MainWindow
+from utils.config_manager import prime_config_cache
 
 def main():
     """
     The main entry point for the QuizGazer application.
     """
+    # 在创建窗口的同时于后台预先读取 config.ini
+    threading.Thread(target=prime_config_cache, daemon=True, name="ConfigPrime").start()
     app = QApplication(sys.argv)
     window = MainWindow()
     window.show()
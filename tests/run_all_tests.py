@@ -120,7 +120,9 @@ class TestRunner:
             ('test_document_processor.py', 'Document Processor Unit Tests'),
             ('test_knowledge_retriever.py', 'Knowledge Retriever Unit Tests'),
             ('test_rag_pipeline.py', 'RAG Pipeline Unit Tests'),
-            ('test_error_handling.py', 'Error Handling Unit Tests')
+            ('test_error_handling.py', 'Error Handling Unit Tests'),
+            ('test_config_manager.py', 'Config Manager Unit Tests'),
+            ('test_web_backend.py', 'Web Backend Unit Tests')
         ]
         
         print(f"\n{'='*80}")
@@ -135,6 +137,10 @@ class TestRunner:
             if kb_test_path.exists():
                 if self.run_python_module(f'core.knowledge_base.{script[:-3]}', description):
                     success_count += 1
+            elif (Path(__file__).parent / script).exists():
+                # tests 目录下的独立测试脚本
+                if self.run_test_script(script, description):
+                    success_count += 1
             else:
                 print(f"⏭️  Skipping {description} - Test file not found")
                 self.test_results.append({
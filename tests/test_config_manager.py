@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""
+Unit tests for utils.config_manager.
+"""
+
+import configparser
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from utils import config_manager as cm
+
+EXAMPLE_CONFIG = project_root / 'config.ini.example'
+
+
+def configparser_sections(text: str) -> dict:
+    """Parse text with configparser the same way the fallback path does."""
+    parser = configparser.ConfigParser(interpolation=None, strict=False)
+    parser.read_string(text)
+    return {name: dict(parser[name]) for name in parser.sections()}
+
+
+class TestLazyConfigParser(unittest.TestCase):
+    """The fast INI parser must agree with configparser."""
+
+    def assert_matches_configparser(self, text: str):
+        self.assertEqual(cm._LazyConfig(text).to_dict(), configparser_sections(text))
+
+    def test_example_config(self):
+        self.assert_matches_configparser(EXAMPLE_CONFIG.read_text(encoding='utf-8'))
+
+    def test_colon_delimiter_and_values_with_separators(self):
+        self.assert_matches_configparser("[a]\nx: 1\ny = a=b:c\nZ = upper\n")
+
+    def test_multiline_values(self):
+        text = "[a]\nx = line1\n  line2\n\n  line3\ny = 2\n[b]\nk = v\n"
+        config = cm._LazyConfig(text)
+        self.assertEqual(config['b'], {'k': 'v'})
+        self.assertEqual(config['a']['x'], 'line1\nline2\n\nline3')
+        self.assertEqual(config.to_dict(), configparser_sections(text))
+
+    def test_default_section_inheritance(self):
+        text = "[DEFAULT]\nshared = 9\n[a]\nx = 1\n[b]\nshared = 3\n"
+        self.assertEqual(cm._LazyConfig(text)['a']['shared'], '9')
+        self.assert_matches_configparser(text)
+
+    def test_default_section_kept_on_write(self):
+        text = "[DEFAULT]\nshared = 9\n[a]\nx = 1\n"
+        parser = cm._LazyConfig(text).to_parser()
+        self.assertEqual(parser.defaults(), {'shared': '9'})
+        self.assertNotIn('shared', parser._sections['a'])
+
+    def test_unparseable_section_raises_read_error(self):
+        config = cm._LazyConfig("[a]\nno delimiter here\n")
+        with self.assertRaises(cm._ConfigReadError):
+            config['a']
+
+
+class TestSaveSections(unittest.TestCase):
+    """save_sections against a scratch config.ini."""
+
+    ORIGINAL = (
+        "[app]\nscreen_number = 1\n\n"
+        "[llm]\napi_key = secret\nmodel_name = model\n\n"
+        "[custom]\nfoo = bar\n"
+    )
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.config_path = os.path.join(self.tmp_dir, 'config.ini')
+        self.write_config(self.ORIGINAL)
+        self.saved_path = cm._CONFIG_PATH
+        cm._CONFIG_PATH = self.config_path
+        self.reset_caches()
+
+    def tearDown(self):
+        cm._CONFIG_PATH = self.saved_path
+        self.reset_caches()
+        shutil.rmtree(self.tmp_dir)
+
+    def reset_caches(self):
+        cm._config_cache.update(sig=None, sections=None)
+        cm._validated_sig = None
+        cm._validated_dirs = ()
+        for cached_fn in cm._CACHED_GETTERS:
+            cached_fn.cache_clear()
+
+    def write_config(self, text: str):
+        with open(self.config_path, 'w', encoding='utf-8') as f:
+            f.write(text)
+
+    def read_back(self) -> dict:
+        with open(self.config_path, encoding='utf-8') as f:
+            return configparser_sections(f.read())
+
+    def test_round_trip_keeps_other_sections(self):
+        cm.save_sections({
+            'app': {'screen_number': 2},
+            'backend': {'enable_history': True, 'user_id': None},
+        })
+        sections = self.read_back()
+        self.assertEqual(sections['app'], {'screen_number': '2'})
+        self.assertEqual(sections['backend'], {'enable_history': 'true', 'user_id': ''})
+        self.assertEqual(sections['llm'], {'api_key': 'secret', 'model_name': 'model'})
+        self.assertEqual(sections['custom'], {'foo': 'bar'})
+
+    def test_unknown_keys_are_ignored(self):
+        cm.save_section('backend', {'base_url': 'http://host:8000', 'bogus': 'x'})
+        self.assertEqual(self.read_back()['backend'], {'base_url': 'http://host:8000'})
+
+    def test_unknown_section_rejected(self):
+        with self.assertRaises(ValueError):
+            cm.save_sections({'custom': {'foo': 'baz'}})
+        self.assertEqual(self.read_back()['custom'], {'foo': 'bar'})
+
+    def test_save_invalidates_cached_getters(self):
+        self.assertEqual(cm.get_app_config()['screen_number'], 1)
+        self.assertEqual(cm.get_model_config('llm')['model_name'], 'model')
+
+        cm.save_sections({'app': {'screen_number': 3}, 'llm': {'model_name': 'other'}})
+        for cached_fn in cm._CACHED_GETTERS:
+            self.assertEqual(cached_fn.cache_info().currsize, 0)
+
+        self.assertEqual(cm.get_app_config()['screen_number'], 3)
+        self.assertEqual(cm.get_model_config('llm')['model_name'], 'other')
+
+    def test_save_keeps_mode_and_leaves_no_temp_files(self):
+        os.chmod(self.config_path, 0o640)
+        cm.save_section('app', {'screen_number': 2})
+        self.assertEqual(os.listdir(self.tmp_dir), ['config.ini'])
+        if os.name == 'posix':
+            self.assertEqual(os.stat(self.config_path).st_mode & 0o777, 0o640)
+
+    def test_validation_recreates_deleted_directories(self):
+        storage_path = os.path.join(self.tmp_dir, 'kb')
+        db_path = os.path.join(self.tmp_dir, 'chroma')
+        cm.save_sections({
+            'knowledge_base': {'enabled': True, 'storage_path': storage_path},
+            'chromadb': {'connection_type': 'local', 'path': db_path},
+        })
+        self.assertTrue(cm.validate_knowledge_base_config())
+        self.assertTrue(os.path.isdir(storage_path))
+        self.assertTrue(os.path.isdir(db_path))
+
+        shutil.rmtree(storage_path)
+        shutil.rmtree(db_path)
+        self.assertTrue(cm.validate_knowledge_base_config())
+        self.assertTrue(os.path.isdir(storage_path))
+        self.assertTrue(os.path.isdir(db_path))
+
+    def test_unreadable_config_is_not_overwritten(self):
+        broken = "[app]\nscreen_number = 1\n[custom]\nno delimiter here\n"
+        self.write_config(broken)
+        with self.assertRaises(cm._ConfigReadError):
+            cm.save_section('app', {'screen_number': 2})
+        with open(self.config_path, encoding='utf-8') as f:
+            self.assertEqual(f.read(), broken)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the web backend quiz and stats endpoints.
+"""
+
+import asyncio
+import os
+import sys
+import tempfile
+import unittest
+from datetime import datetime
+from pathlib import Path
+
+# Add web backend to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root / 'web' / 'backend'))
+
+# database.py creates ./data/quiz_history.db relative to the working directory,
+# so import the backend from a scratch directory
+os.chdir(tempfile.mkdtemp(prefix='quizgazer_test_'))
+os.makedirs('uploads/images', exist_ok=True)
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from database import Base, AsyncSessionLocal, async_engine
+from models import QuizRecord
+from api.endpoints import quiz, stats
+
+
+async def create_tables():
+    async with async_engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    await async_engine.dispose()
+
+
+async def insert_records(records):
+    async with AsyncSessionLocal() as db:
+        db.add_all(records)
+        await db.commit()
+        ids = [record.id for record in records]
+    await async_engine.dispose()
+    return ids
+
+
+def make_record(timestamp=None, **kwargs):
+    return QuizRecord(
+        question_text='question', answer_text='answer',
+        vlm_model='vlm', llm_model='llm',
+        ocr_time=1.0, answer_time=2.0, total_time=3.0,
+        timestamp=timestamp, **kwargs
+    )
+
+
+class BackendTestCase(unittest.TestCase):
+    """Each test runs against an empty quiz_records table."""
+
+    def setUp(self):
+        asyncio.run(create_tables())
+        app = FastAPI()
+        app.include_router(quiz.public_router)
+        app.include_router(quiz.protected_router)
+        app.include_router(stats.router)
+        self.client = TestClient(app)
+        self.client.__enter__()
+
+    def tearDown(self):
+        self.client.__exit__(None, None, None)
+
+        async def drop_tables():
+            async with async_engine.begin() as conn:
+                await conn.run_sync(Base.metadata.drop_all)
+            await async_engine.dispose()
+        asyncio.run(drop_tables())
+
+
+class TestCursorPagination(BackendTestCase):
+
+    def test_pages_through_equal_timestamps(self):
+        same_time = datetime(2024, 1, 1, 12, 0, 0)
+        ids = asyncio.run(insert_records(
+            [make_record(datetime(2024, 1, 2))]
+            + [make_record(same_time) for _ in range(5)]
+            + [make_record(datetime(2023, 12, 31))]
+        ))
+        # 期望顺序：timestamp 倒序，同一时间内 id 倒序
+        expected = [ids[0]] + sorted(ids[1:6], reverse=True) + [ids[6]]
+
+        response = self.client.get('/api/quiz/records', params={'limit': 2})
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual(data['total'], 7)
+        self.assertEqual(data['page'], 1)
+        seen = [record['id'] for record in data['records']]
+
+        while data['next_cursor']:
+            response = self.client.get(
+                '/api/quiz/records',
+                params={'limit': 2, 'cursor': data['next_cursor']}
+            )
+            self.assertEqual(response.status_code, 200)
+            data = response.json()
+            self.assertIsNone(data['total'])
+            self.assertIsNone(data['page'])
+            self.assertIsNone(data['pages'])
+            seen.extend(record['id'] for record in data['records'])
+
+        self.assertEqual(seen, expected)
+
+    def test_invalid_cursor(self):
+        response = self.client.get('/api/quiz/records', params={'cursor': '%%%'})
+        self.assertEqual(response.status_code, 400)
+
+
+class TestStatsCache(BackendTestCase):
+
+    def post_record(self):
+        response = self.client.post(
+            '/api/quiz/record-with-image',
+            data={
+                'question_text': 'q', 'answer_text': 'a',
+                'vlm_model': 'vlm', 'llm_model': 'llm',
+                'ocr_time': '1.0', 'answer_time': '2.0',
+            },
+            files={'image': ('test.png', b'png-bytes', 'image/png')}
+        )
+        self.assertEqual(response.status_code, 200)
+        return response.json()['id']
+
+    def total_quizzes(self):
+        response = self.client.get('/api/stats')
+        self.assertEqual(response.status_code, 200)
+        return response.json()['total_quizzes']
+
+    def test_insert_invalidates_cache(self):
+        first_id = self.post_record()
+        self.assertEqual(self.total_quizzes(), 1)
+        self.post_record()
+        self.assertEqual(self.total_quizzes(), 2)
+
+        # 删除非最新的记录不改变最大 ID，只能靠版本号让缓存失效
+        response = self.client.delete(f'/api/quiz/record/{first_id}')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.total_quizzes(), 1)
+
+    def test_cached_response_reused(self):
+        self.post_record()
+        self.assertEqual(self.total_quizzes(), 1)
+        version = stats._stats_cache['version']
+        computed_at = stats._stats_cache['computed_at']
+        self.assertEqual(self.total_quizzes(), 1)
+        self.assertEqual(stats._stats_cache['version'], version)
+        self.assertEqual(stats._stats_cache['computed_at'], computed_at)
+
+
+if __name__ == '__main__':
+    unittest.main()
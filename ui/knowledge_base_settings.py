@@ -36,8 +36,7 @@ try:
     from utils.config_manager import (
         get_knowledge_base_config, get_chromadb_config, 
         get_embedding_api_config, get_reranker_api_config,
-        save_knowledge_base_config, save_chromadb_config,
-        save_embedding_api_config, save_reranker_api_config
+        save_sections
     )
     from core import ai_services
     CONFIG_AVAILABLE = True
@@ -793,20 +792,18 @@ Reranker API用于对搜索结果进行重新排序，提高搜索结果的相
             }
             print(f"📝 [知识库设置] 知识库配置内容: {kb_config}")
             
-            print("💾 [知识库设置] 调用 save_knowledge_base_config...")
-            save_knowledge_base_config(kb_config)
-            print("✅ [知识库设置] 知识库配置保存完成")
+            # 各配置节先收集起来，最后一次性写入 config.ini
+            updates = {'knowledge_base': kb_config}
             
             # Save ChromaDB config
-            print("🗄️ [知识库设置] 保存 ChromaDB 配置...")
+            print("🗄️ [知识库设置] 收集 ChromaDB 配置...")
             chromadb_config = self.get_current_config("chromadb")
             if chromadb_config:
                 print(f"📝 [知识库设置] ChromaDB 配置内容: {chromadb_config}")
-                save_chromadb_config(chromadb_config)
-                print("✅ [知识库设置] ChromaDB 配置保存完成")
+                updates['chromadb'] = chromadb_config
             
             # Save embedding config
-            print("🔤 [知识库设置] 保存 Embedding API 配置...")
+            print("🔤 [知识库设置] 收集 Embedding API 配置...")
             embedding_config = self.get_current_config("embedding")
             if embedding_config:
                 # 隐藏API密钥用于日志
@@ -814,11 +811,10 @@ Reranker API用于对搜索结果进行重新排序，提高搜索结果的相
                 if 'api_key' in safe_config:
                     safe_config['api_key'] = '***隐藏***'
                 print(f"📝 [知识库设置] Embedding 配置内容: {safe_config}")
-                save_embedding_api_config(embedding_config)
-                print("✅ [知识库设置] Embedding API 配置保存完成")
+                updates['embedding_api'] = embedding_config
             
             # Save reranker config
-            print("🔄 [知识库设置] 保存 Reranker API 配置...")
+            print("🔄 [知识库设置] 收集 Reranker API 配置...")
             reranker_config = self.get_current_config("reranker")
             if reranker_config:
                 # 隐藏API密钥用于日志
@@ -826,8 +822,10 @@ Reranker API用于对搜索结果进行重新排序，提高搜索结果的相
                 if 'api_key' in safe_config:
                     safe_config['api_key'] = '***隐藏***'
                 print(f"📝 [知识库设置] Reranker 配置内容: {safe_config}")
-                save_reranker_api_config(reranker_config)
-                print("✅ [知识库设置] Reranker API 配置保存完成")
+                updates['reranker_api'] = reranker_config
+            
+            print(f"💾 [知识库设置] 写入配置节: {list(updates)}")
+            save_sections(updates)
             
             print("🎉 [知识库设置] 所有设置保存成功！")
             
@@ -1,19 +1,22 @@
+import logging
+import os
 import sys
 from PySide6.QtWidgets import (
     QApplication, QMainWindow, QPushButton, QVBoxLayout, QWidget,
-    QLineEdit, QTextEdit, QLabel, QHBoxLayout, QFrame, QCheckBox, QStyleFactory,
-    QDialog, QComboBox, QFormLayout, QPushButton, QDialogButtonBox, QTabWidget,
-    QMessageBox
+    QLineEdit, QTextEdit, QLabel, QHBoxLayout, QCheckBox,
+    QDialog, QComboBox, QFormLayout, QDialogButtonBox, QTabWidget,
+    QMessageBox, QMenu
 )
-from PySide6.QtCore import (Qt, QPoint, QPropertyAnimation, QEasingCurve, QSize,
-                            QRunnable, Slot, Signal, QObject, QThreadPool)
-from PySide6.QtGui import QIcon, QClipboard
+from PySide6.QtCore import (Qt, QPoint, QRect, QPropertyAnimation, QEasingCurve, QSize,
+                            QRunnable, Slot, Signal, QObject, QThreadPool, QTimer)
+from PySide6.QtGui import QGuiApplication
 
 from core.screenshot_handler import take_screenshot, get_available_screens
 from utils.config_manager import get_app_config, save_app_config
 from core.ai_services import get_question_from_image, get_answer_from_text, get_direct_answer_from_image
 import time
 import asyncio
+import functools
 
 # Import checkbox utilities for robust state handling
 try:
@@ -25,15 +28,205 @@ except ImportError:
             return checkbox.isChecked()
         except:
             return False
-# Try to import full knowledge base components, fallback to simplified versions
-try:
-    from ui.knowledge_base_panel import KnowledgeBasePanel
-    from ui.knowledge_base_settings import KnowledgeBaseSettingsDialog
-    print("Using full knowledge base components")
-except ImportError as e:
-    print(f"Using simplified knowledge base components: {e}")
-    from ui.knowledge_base_panel_simple import KnowledgeBasePanel
-    from ui.knowledge_base_settings_simple import KnowledgeBaseSettingsDialog
+
+@functools.lru_cache(maxsize=None)
+def _kb_classes():
+    """
+    惰性导入知识库组件，仅在首次使用知识库标签页或设置时加载。
+    优先使用完整版本，失败时回退到简化版本。
+    
+    Returns:
+        tuple: (KnowledgeBasePanel, KnowledgeBaseSettingsDialog)
+    """
+    try:
+        from ui.knowledge_base_panel import KnowledgeBasePanel
+        from ui.knowledge_base_settings import KnowledgeBaseSettingsDialog
+    except ImportError as e:
+        print(f"Using simplified knowledge base components: {e}")
+        from ui.knowledge_base_panel_simple import KnowledgeBasePanel
+        from ui.knowledge_base_settings_simple import KnowledgeBaseSettingsDialog
+    return KnowledgeBasePanel, KnowledgeBaseSettingsDialog
+
+# --- Theme styles ---
+def _build_theme_styles(bg_color, border_color, button_bg, button_border, button_hover,
+                        button_pressed, text_color, input_bg, input_border,
+                        readonly_bg, icon_bar_bg):
+    """Build all stylesheet strings for one theme (called once per theme at import)."""
+    def button_style(font_size):
+        return f"""
+            QPushButton {{
+                font-size: {font_size};
+                background-color: {button_bg};
+                border: 1px solid {button_border};
+                border-radius: 8px;
+                color: {text_color};
+                padding: 5px;
+                margin: 5px;
+            }}
+            QPushButton:hover {{
+                background-color: {button_hover};
+            }}
+            QPushButton:pressed {{
+                background-color: {button_pressed};
+            }}
+        """
+
+    base_button = button_style("12px")
+    label = f"color: {text_color};"
+    return {
+        # Main window background
+        'central': f"""
+            QWidget#central_widget {{
+                background-color: {bg_color};
+                border-radius: 10px;
+                border: 1px solid {border_color};
+            }}
+        """,
+        'base_button': base_button,
+        'icon_bar': f"background-color: {icon_bar_bg}; border-radius: 0px;",
+        'input': f"""
+            border: 1px solid {input_border};
+            padding: 5px;
+            background-color: {input_bg};
+            color: {text_color};
+            border-radius: 5px;
+        """,
+        'readonly_input': f"""
+            background-color: {readonly_bg};
+            border: 1px solid {input_border};
+            padding: 5px;
+            color: {text_color};
+            border-radius: 5px;
+        """,
+        'label': label,
+        'pin_on': base_button + "QPushButton { color: green; }",
+        'pin_off': base_button + "QPushButton { color: dimgray; }",
+        'capture_button': button_style("16px"),
+        'icon_button': base_button + "QPushButton { font-size: 20px; }",
+        'exit_button': base_button + """
+            QPushButton:hover {
+                background-color: rgba(255, 0, 0, 0.6);
+                color: white;
+            }
+        """,
+        'checkbox': f"QCheckBox {{ {label} }} QCheckBox::indicator {{ width: 15px; height: 15px; }}",
+    }
+
+_DARK_STYLES = _build_theme_styles(
+    bg_color="rgba(45, 45, 45, 0.95)",
+    border_color="rgba(80, 80, 80, 0.8)",
+    button_bg="#404040",
+    button_border="#606060",
+    button_hover="#505050",
+    button_pressed="#353535",
+    text_color="#E0E0E0",
+    input_bg="#2D2D2D",
+    input_border="#555555",
+    readonly_bg="#3A3A3A",
+    icon_bar_bg="rgba(30, 30, 30, 0.8)",
+)
+
+# Light theme colors (original)
+_LIGHT_STYLES = _build_theme_styles(
+    bg_color="rgba(240, 240, 240, 0.9)",
+    border_color="rgba(0, 0, 0, 0.1)",
+    button_bg="#EAEAEA",
+    button_border="#D0D0D0",
+    button_hover="#DCDCDC",
+    button_pressed="#C8C8C8",
+    text_color="#333",
+    input_bg="white",
+    input_border="#cccccc",
+    readonly_bg="#f9f9f9",
+    icon_bar_bg="rgba(0, 0, 0, 0.05)",
+)
+
+logger = logging.getLogger(__name__)
+
+# --- Win32 constants used by _ensure_topmost ---
+HWND_TOPMOST = -1
+GWL_EXSTYLE = -20
+WS_EX_TOPMOST = 0x00000008
+SWP_NOSIZE = 0x0001
+SWP_NOMOVE = 0x0002
+SWP_NOACTIVATE = 0x0010
+SWP_SHOWWINDOW = 0x0040
+SWP_NOSENDCHANGING = 0x0400  # 不发送WM_WINDOWPOSCHANGING
+
+# 平台判断在导入时确定一次
+_IS_WIN32 = sys.platform == 'win32'
+
+if _IS_WIN32:
+    # 导入时一次性绑定user32函数并声明参数类型，避免每次调用时查找和猜测参数转换
+    import ctypes
+    from ctypes import wintypes
+
+    _user32 = ctypes.WinDLL('user32', use_last_error=True)
+
+    _SetWindowPos = _user32.SetWindowPos
+    _SetWindowPos.argtypes = [wintypes.HWND, wintypes.HWND, ctypes.c_int, ctypes.c_int,
+                              ctypes.c_int, ctypes.c_int, ctypes.c_uint]
+    _SetWindowPos.restype = wintypes.BOOL
+
+    _SetActiveWindow = _user32.SetActiveWindow
+    _SetActiveWindow.argtypes = [wintypes.HWND]
+    _SetActiveWindow.restype = wintypes.HWND
+
+    _SetForegroundWindow = _user32.SetForegroundWindow
+    _SetForegroundWindow.argtypes = [wintypes.HWND]
+    _SetForegroundWindow.restype = wintypes.BOOL
+
+    _BeginDeferWindowPos = _user32.BeginDeferWindowPos
+    _BeginDeferWindowPos.argtypes = [ctypes.c_int]
+    _BeginDeferWindowPos.restype = wintypes.HANDLE
+
+    _DeferWindowPos = _user32.DeferWindowPos
+    _DeferWindowPos.argtypes = [wintypes.HANDLE, wintypes.HWND, wintypes.HWND, ctypes.c_int,
+                                ctypes.c_int, ctypes.c_int, ctypes.c_int, ctypes.c_uint]
+    _DeferWindowPos.restype = wintypes.HANDLE
+
+    _EndDeferWindowPos = _user32.EndDeferWindowPos
+    _EndDeferWindowPos.argtypes = [wintypes.HANDLE]
+    _EndDeferWindowPos.restype = wintypes.BOOL
+
+    _GetWindowLongW = _user32.GetWindowLongW
+    _GetWindowLongW.argtypes = [wintypes.HWND, ctypes.c_int]
+    _GetWindowLongW.restype = wintypes.LONG
+
+# 拖动窗口时两次实际移动之间的最小间隔（约60Hz）
+_DRAG_MOVE_INTERVAL_MS = 16
+
+def _set_style_sheet(widget, style):
+    """Set a stylesheet only if it differs; Qt re-parses and re-polishes on every set."""
+    if widget.styleSheet() != style:
+        widget.setStyleSheet(style)
+
+# --- Screen list cache ---
+# 屏幕枚举开销较大，缓存结果，仅在屏幕增减时失效
+_screens_cache = None
+_screen_watch_connected = False
+
+def _get_cached_screens():
+    """获取可用屏幕列表（带缓存）"""
+    global _screens_cache
+    if _screens_cache is None:
+        _screens_cache = get_available_screens()
+    return _screens_cache
+
+def _invalidate_screens_cache(*_):
+    """屏幕增减时清空缓存"""
+    global _screens_cache
+    _screens_cache = None
+
+def _watch_screen_changes():
+    """连接屏幕增减信号（只连接一次）"""
+    global _screen_watch_connected
+    app = QGuiApplication.instance()
+    if _screen_watch_connected or app is None:
+        return
+    app.screenAdded.connect(_invalidate_screens_cache)
+    app.screenRemoved.connect(_invalidate_screens_cache)
+    _screen_watch_connected = True
 
 # --- History Settings Dialog ---
 class HistorySettingsDialog(QDialog):
@@ -114,7 +307,7 @@ class SettingsDialog(QDialog):
         
         # Get current settings
         self.app_config = get_app_config()
-        self.screens = get_available_screens()
+        self.screens = _get_cached_screens()
         
         # Create form layout
         layout = QFormLayout(self)
@@ -194,9 +387,14 @@ class MainWindow(QMainWindow):
         self.compact_width = 80
         self.expanded_width = 480 # compact_width + result_view_width
         self.window_height = 400
-        self.threadpool = QThreadPool()
-        self.threadpool.setMaxThreadCount(4)
+        # 使用进程共享的全局线程池，避免为每个窗口额外创建一组工作线程
+        self.threadpool = QThreadPool.globalInstance()
+        # AI请求和历史上传都是I/O密集型任务，线程数不必受CPU核数限制
+        self.threadpool.setMaxThreadCount(max(4, os.cpu_count() or 4))
         print(f"Multithreading with maximum {self.threadpool.maxThreadCount()} threads")
+        # 截图使用独立的单线程池，避免排在AI请求之后
+        self._capture_pool = QThreadPool()
+        self._capture_pool.setMaxThreadCount(1)
         
         # 历史记录相关变量
         self.last_screenshot_bytes = None
@@ -204,36 +402,34 @@ class MainWindow(QMainWindow):
         self.ocr_end_time = None
         self.answer_start_time = None
         self.answer_end_time = None
+        # 展开/收起动画（复用同一实例）
+        self._size_anim = QPropertyAnimation(self, b"geometry")
+        self._size_anim.setDuration(250)
+        self._size_anim.setEasingCurve(QEasingCurve.InOutQuart)
+        # 原生窗口句柄，仅在Windows API需要时才惰性获取
+        self._hwnd = None
+        # 截图/AI处理进行中标志，防止重复点击堆积任务
+        self._capture_busy = False
+        # 截图流程编号：每次截图递增，只有带当前编号的结果才能结束截图流程
+        self._capture_token = 0
+        # 答案请求合并：进行中时只保留最新的问题
+        self._pending_question = None
+        self._answer_in_flight = False
+        # 进行中的答案请求所属的截图流程编号；手动请求为None
+        self._in_flight_token = None
+        # 设置菜单在首次点击时创建，之后复用
+        self._settings_menu = None
+        # 屏幕列表缓存在屏幕增减时失效
+        _watch_screen_changes()
         self.setup_ui()
         # 不再隐藏结果视图，默认显示
         
-        # Set up theme monitoring
-        self.setup_theme_monitoring()
+        # 由Qt通知系统配色方案变化，无需轮询
+        QGuiApplication.styleHints().colorSchemeChanged.connect(self._on_color_scheme_changed)
         
         # Ensure initial button styles are correct (after theme is applied)
         self.update_pin_button_style()
     
-    def detect_dark_mode(self):
-        """Detect if the system is using dark mode."""
-        try:
-            if sys.platform == 'win32':
-                import winreg
-                try:
-                    registry = winreg.ConnectRegistry(None, winreg.HKEY_CURRENT_USER)
-                    key = winreg.OpenKey(registry, r"SOFTWARE\Microsoft\Windows\CurrentVersion\Themes\Personalize")
-                    value, _ = winreg.QueryValueEx(key, "AppsUseLightTheme")
-                    winreg.CloseKey(key)
-                    return value == 0  # 0 means dark mode, 1 means light mode
-                except:
-                    pass
-            
-            # Fallback: check Qt palette
-            palette = QApplication.palette()
-            window_color = palette.color(palette.Window)
-            return window_color.lightness() < 128
-        except:
-            return False  # Default to light mode if detection fails
-    
     def apply_theme_styles(self):
         """Apply theme-aware styles based on dark/light mode."""
         if self.is_dark_mode:
@@ -243,149 +439,29 @@ class MainWindow(QMainWindow):
     
     def apply_dark_theme(self):
         """Apply dark theme styles."""
-        # Dark theme colors
-        bg_color = "rgba(45, 45, 45, 0.95)"
-        border_color = "rgba(80, 80, 80, 0.8)"
-        button_bg = "#404040"
-        button_border = "#606060"
-        button_hover = "#505050"
-        button_pressed = "#353535"
-        text_color = "#E0E0E0"
-        input_bg = "#2D2D2D"
-        input_border = "#555555"
-        
-        # Main window background
-        self.central_widget.setStyleSheet(f"""
-            QWidget#central_widget {{
-                background-color: {bg_color};
-                border-radius: 10px;
-                border: 1px solid {border_color};
-            }}
-        """)
-        
-        # Button styles
-        self.base_button_style = f"""
-            QPushButton {{
-                font-size: 12px;
-                background-color: {button_bg};
-                border: 1px solid {button_border};
-                border-radius: 8px;
-                color: {text_color};
-                padding: 5px;
-                margin: 5px;
-            }}
-            QPushButton:hover {{
-                background-color: {button_hover};
-            }}
-            QPushButton:pressed {{
-                background-color: {button_pressed};
-            }}
-        """
-        
-        # Icon bar style
-        self.icon_bar_style = f"background-color: rgba(30, 30, 30, 0.8); border-radius: 0px;"
-        
-        # Input/text styles
-        self.input_style = f"""
-            border: 1px solid {input_border};
-            padding: 5px;
-            background-color: {input_bg};
-            color: {text_color};
-            border-radius: 5px;
-        """
-        
-        self.readonly_input_style = f"""
-            background-color: #3A3A3A;
-            border: 1px solid {input_border};
-            padding: 5px;
-            color: {text_color};
-            border-radius: 5px;
-        """
-        
-        # Label style
-        self.label_style = f"color: {text_color};"
-        
-        # Update button styles that depend on base_button_style
-        self.capture_button_style = self.base_button_style.replace("12px", "16px")
-        self.exit_button_style = self.base_button_style + """
-            QPushButton:hover {
-                background-color: rgba(255, 0, 0, 0.6);
-                color: white;
-            }
-        """
+        self._apply_style_dict(_DARK_STYLES)
     
     def apply_light_theme(self):
         """Apply light theme styles."""
-        # Light theme colors (original)
-        bg_color = "rgba(240, 240, 240, 0.9)"
-        border_color = "rgba(0, 0, 0, 0.1)"
-        button_bg = "#EAEAEA"
-        button_border = "#D0D0D0"
-        button_hover = "#DCDCDC"
-        button_pressed = "#C8C8C8"
-        text_color = "#333"
-        input_bg = "white"
-        input_border = "#cccccc"
+        self._apply_style_dict(_LIGHT_STYLES)
+    
+    def _apply_style_dict(self, styles):
+        """Apply a prebuilt theme style dict to the window."""
+        self._styles = styles
         
         # Main window background
-        self.central_widget.setStyleSheet(f"""
-            QWidget#central_widget {{
-                background-color: {bg_color};
-                border-radius: 10px;
-                border: 1px solid {border_color};
-            }}
-        """)
-        
-        # Button styles
-        self.base_button_style = f"""
-            QPushButton {{
-                font-size: 12px;
-                background-color: {button_bg};
-                border: 1px solid {button_border};
-                border-radius: 8px;
-                color: {text_color};
-                padding: 5px;
-                margin: 5px;
-            }}
-            QPushButton:hover {{
-                background-color: {button_hover};
-            }}
-            QPushButton:pressed {{
-                background-color: {button_pressed};
-            }}
-        """
-        
-        # Icon bar style
-        self.icon_bar_style = "background-color: rgba(0, 0, 0, 0.05); border-radius: 0px;"
-        
-        # Input/text styles
-        self.input_style = f"""
-            border: 1px solid {input_border};
-            padding: 5px;
-            background-color: {input_bg};
-            color: {text_color};
-            border-radius: 5px;
-        """
-        
-        self.readonly_input_style = f"""
-            background-color: #f9f9f9;
-            border: 1px solid {input_border};
-            padding: 5px;
-            color: {text_color};
-            border-radius: 5px;
-        """
-        
-        # Label style
-        self.label_style = f"color: {text_color};"
-        
-        # Update button styles that depend on base_button_style
-        self.capture_button_style = self.base_button_style.replace("12px", "16px")
-        self.exit_button_style = self.base_button_style + """
-            QPushButton:hover {
-                background-color: rgba(255, 0, 0, 0.6);
-                color: white;
-            }
-        """
+        _set_style_sheet(self.central_widget, styles['central'])
+        
+        self.base_button_style = styles['base_button']
+        self.icon_bar_style = styles['icon_bar']
+        self.input_style = styles['input']
+        self.readonly_input_style = styles['readonly_input']
+        self.label_style = styles['label']
+        self.capture_button_style = styles['capture_button']
+        self.exit_button_style = styles['exit_button']
+        self.icon_button_style = styles['icon_button']
+        self._pin_style_on = styles['pin_on']
+        self._pin_style_off = styles['pin_off']
     
     def update_all_styles(self):
         """Update all component styles after theme change."""
@@ -395,7 +471,7 @@ class MainWindow(QMainWindow):
             
             # Update icon bar
             if hasattr(self, 'icon_bar_widget'):
-                self.icon_bar_widget.setStyleSheet(self.icon_bar_style)
+                _set_style_sheet(self.icon_bar_widget, self.icon_bar_style)
             
             # Update buttons
             button_components = [
@@ -407,61 +483,46 @@ class MainWindow(QMainWindow):
                 if hasattr(self, button_name):
                     button = getattr(self, button_name)
                     if button_name == 'capture_button':
-                        button.setStyleSheet(self.capture_button_style)
+                        _set_style_sheet(button, self.capture_button_style)
                     elif button_name == 'exit_button':
-                        button.setStyleSheet(self.exit_button_style)
+                        _set_style_sheet(button, self.exit_button_style)
                     elif button_name == 'pin_button':
-                        if self.is_pinned:
-                            button.setStyleSheet(self.base_button_style + "QPushButton { color: green; }")
-                        else:
-                            button.setStyleSheet(self.base_button_style + "QPushButton { color: dimgray; }")
+                        _set_style_sheet(button, self._pin_style_on if self.is_pinned else self._pin_style_off)
                     elif button_name in ['knowledge_base_button', 'settings_button']:
-                        button.setStyleSheet(self.base_button_style + "QPushButton { font-size: 20px; }")
+                        _set_style_sheet(button, self.icon_button_style)
                     else:
-                        button.setStyleSheet(self.base_button_style)
+                        _set_style_sheet(button, self.base_button_style)
             
             # Update text inputs
             if hasattr(self, 'question_input'):
-                self.question_input.setStyleSheet(self.input_style)
+                _set_style_sheet(self.question_input, self.input_style)
             if hasattr(self, 'answer_display'):
-                self.answer_display.setStyleSheet(self.readonly_input_style)
+                _set_style_sheet(self.answer_display, self.readonly_input_style)
             
             # Update labels
             label_components = ['question_label', 'answer_label']
             for label_name in label_components:
                 if hasattr(self, label_name):
-                    getattr(self, label_name).setStyleSheet(self.label_style)
+                    _set_style_sheet(getattr(self, label_name), self.label_style)
             
             # Update checkboxes
-            checkbox_style = f"QCheckBox {{ {self.label_style} }} QCheckBox::indicator {{ width: 15px; height: 15px; }}"
             if hasattr(self, 'force_search_checkbox'):
-                self.force_search_checkbox.setStyleSheet(checkbox_style)
+                _set_style_sheet(self.force_search_checkbox, self._styles['checkbox'])
             if hasattr(self, 'direct_mode_checkbox'):
-                self.direct_mode_checkbox.setStyleSheet(checkbox_style)
+                _set_style_sheet(self.direct_mode_checkbox, self._styles['checkbox'])
     
-    def setup_theme_monitoring(self):
-        """Set up monitoring for theme changes."""
-        from PySide6.QtCore import QTimer
-        
-        self.theme_check_timer = QTimer()
-        self.theme_check_timer.timeout.connect(self.check_theme_change)
-        self.theme_check_timer.start(2000)  # Check every 2 seconds
-    
-    def check_theme_change(self):
-        """Check if the system theme has changed."""
-        current_dark_mode = self.detect_dark_mode()
-        if current_dark_mode != self.is_dark_mode:
-            print(f"Theme changed: {'Dark' if current_dark_mode else 'Light'} mode detected")
-            self.is_dark_mode = current_dark_mode
+    def _on_color_scheme_changed(self, scheme):
+        """Handle system color scheme changes reported by Qt."""
+        is_dark_mode = scheme == Qt.ColorScheme.Dark
+        if is_dark_mode != self.is_dark_mode:
+            print(f"Theme changed: {'Dark' if is_dark_mode else 'Light'} mode detected")
+            self.is_dark_mode = is_dark_mode
             self.update_all_styles()
     
     def update_pin_button_style(self):
         """Update pin button style based on current state."""
         if hasattr(self, 'pin_button'):
-            if self.is_pinned:
-                self.pin_button.setStyleSheet(self.base_button_style + "QPushButton { color: green; }")
-            else:
-                self.pin_button.setStyleSheet(self.base_button_style + "QPushButton { color: dimgray; }")
+            _set_style_sheet(self.pin_button, self._pin_style_on if self.is_pinned else self._pin_style_off)
 
     def setup_ui(self):
         self.setWindowTitle("QuizGazer")
@@ -473,13 +534,10 @@ class MainWindow(QMainWindow):
         
         self.setWindowFlags(flags)
         self.setAttribute(Qt.WA_TranslucentBackground)
-        # 设置窗口为DPI感知
-        if sys.platform == 'win32':
-            self.setAttribute(Qt.WA_NativeWindow)
         self.setGeometry(100, 100, self.expanded_width, self.window_height)  # 默认使用展开宽度
 
         # Detect dark mode
-        self.is_dark_mode = self.detect_dark_mode()
+        self.is_dark_mode = QGuiApplication.styleHints().colorScheme() == Qt.ColorScheme.Dark
         
         # Main widget and layout
         self.central_widget = QWidget()
@@ -510,16 +568,16 @@ class MainWindow(QMainWindow):
         
         self.pin_button = QPushButton("📌")
         self.pin_button.setFixedSize(30, 30)
-        self.pin_button.setStyleSheet(self.base_button_style + "QPushButton { color: green; }")
+        self.pin_button.setStyleSheet(self._pin_style_on)
         
         self.knowledge_base_button = QPushButton("📚")
         self.knowledge_base_button.setFixedSize(40, 40)
-        self.knowledge_base_button.setStyleSheet(self.base_button_style + "QPushButton { font-size: 20px; }")
+        self.knowledge_base_button.setStyleSheet(self.icon_button_style)
         self.knowledge_base_button.setToolTip("知识库")
         
         self.settings_button = QPushButton("⚙️")
         self.settings_button.setFixedSize(40, 40)
-        self.settings_button.setStyleSheet(self.base_button_style + "QPushButton { font-size: 20px; }")
+        self.settings_button.setStyleSheet(self.icon_button_style)
         
         self.exit_button = QPushButton("✕")
         self.exit_button.setFixedSize(30, 30)
@@ -529,13 +587,12 @@ class MainWindow(QMainWindow):
         icon_layout.addWidget(self.pin_button, alignment=Qt.AlignTop | Qt.AlignHCenter)
         
         self.force_search_checkbox = QCheckBox("🌐")
-        checkbox_style = f"QCheckBox {{ {self.label_style} }} QCheckBox::indicator {{ width: 15px; height: 15px; }}"
-        self.force_search_checkbox.setStyleSheet(checkbox_style)
+        self.force_search_checkbox.setStyleSheet(self._styles['checkbox'])
         self.force_search_checkbox.setToolTip("强制使用搜索工具")
         icon_layout.addWidget(self.force_search_checkbox, alignment=Qt.AlignTop | Qt.AlignHCenter)
 
         self.direct_mode_checkbox = QCheckBox("👁️")
-        self.direct_mode_checkbox.setStyleSheet(checkbox_style)
+        self.direct_mode_checkbox.setStyleSheet(self._styles['checkbox'])
         self.direct_mode_checkbox.setToolTip("直接模式：适用于包含图形、图表的题目")
         icon_layout.addWidget(self.direct_mode_checkbox, alignment=Qt.AlignTop | Qt.AlignHCenter)
 
@@ -585,12 +642,14 @@ class MainWindow(QMainWindow):
         main_tab_layout.addWidget(self.answer_display)
         main_tab_layout.addLayout(bottom_button_layout)
         
-        # Knowledge base tab
-        self.knowledge_base_tab = KnowledgeBasePanel()
+        # Knowledge base tab - 先放置占位控件，首次切换到该标签页时再创建知识库面板
+        self._kb_placeholder = QWidget()
+        self.knowledge_base_tab = self._kb_placeholder
         
         # Add tabs to tab widget
         self.tab_widget.addTab(self.main_tab, "问答")
         self.tab_widget.addTab(self.knowledge_base_tab, "知识库")
+        self.tab_widget.currentChanged.connect(self._maybe_init_kb)
         
         result_view_layout.addWidget(self.tab_widget)
 
@@ -612,32 +671,56 @@ class MainWindow(QMainWindow):
 
         # Make window draggable
         self.old_pos = self.pos()
+        # 拖动时合并鼠标移动事件，由定时器按帧率统一移动窗口
+        self._pending_pos = None
+        self._drag_timer = QTimer(self)
+        self._drag_timer.setInterval(_DRAG_MOVE_INTERVAL_MS)
+        self._drag_timer.timeout.connect(self._flush_drag)
 
     def on_capture_clicked(self):
-        # 保存当前窗口位置和状态
-        current_pos = self.pos()
-        current_size = self.size()
-        was_visible = self.isVisible()
-        
-        # 临时最小化窗口进行截图
-        self.showMinimized()
-        QApplication.processEvents()
-        
-        # 等待一小段时间确保窗口完全最小化
-        import time
+        # 上一次截图/识别尚未完成时忽略点击
+        if self._capture_busy:
+            return
+        self._capture_busy = True
+        self._capture_token += 1
+        self.capture_button.setEnabled(False)
+        
+        # 截图前将窗口设为透明，避免出现在截图中
+        self.setWindowOpacity(0.0)
+        # 等当前事件循环迭代结束（透明帧已提交）后再启动截图，不阻塞GUI线程
+        QTimer.singleShot(0, self._start_capture_worker)
+
+    def _start_capture_worker(self):
+        """在专用的截图线程池中执行截图"""
+        worker = Worker(self._capture_screen)
+        worker.signals.result.connect(self._on_screenshot_ready)
+        worker.signals.error.connect(self._on_screenshot_error)
+        self._capture_pool.start(worker)
+
+    @staticmethod
+    def _capture_screen():
+        """截图工作函数（在工作线程中运行）"""
+        # 等待一小段时间确保窗口透明效果已生效
         time.sleep(0.1)
-        
-        screenshot_bytes = take_screenshot()
-        
-        # 恢复窗口状态
-        if was_visible:
-            self.showNormal()
-            self.resize(current_size)
-            self.move(current_pos)
-            self.raise_()
-            self.activateWindow()
+        return take_screenshot()
+
+    def _on_screenshot_error(self, error_tuple):
+        """截图失败时恢复窗口并显示错误"""
+        self.setWindowOpacity(1.0)
+        self._on_capture_error(error_tuple)
+
+    def _on_capture_error(self, error_tuple):
+        """截图流程中（截图、识别、直接模式）出错，结束本次截图流程"""
+        self._finish_capture(self._capture_token)
+        self.on_ai_error(error_tuple)
+
+    def _on_screenshot_ready(self, screenshot_bytes):
+        """截图完成后恢复窗口并提交AI处理任务"""
+        # 恢复窗口显示
+        self.setWindowOpacity(1.0)
         
         if not screenshot_bytes:
+            self._finish_capture(self._capture_token)
             return
 
         # 保存截图数据和时间戳，用于历史记录上传
@@ -659,7 +742,7 @@ class MainWindow(QMainWindow):
             
             worker = Worker(get_direct_answer_from_image, screenshot_bytes, force_search=force_search)
             worker.signals.result.connect(self.on_direct_answer_ready)
-            worker.signals.error.connect(self.on_ai_error)
+            worker.signals.error.connect(self._on_capture_error)
             self.threadpool.start(worker)
         else:
             # 传统模式：先提取问题，再获取答案
@@ -668,7 +751,7 @@ class MainWindow(QMainWindow):
 
             worker = Worker(get_question_from_image, screenshot_bytes)
             worker.signals.result.connect(self.on_question_ready)
-            worker.signals.error.connect(self.on_ai_error)
+            worker.signals.error.connect(self._on_capture_error)
             self.threadpool.start(worker)
 
     def on_question_ready(self, question_text):
@@ -680,9 +763,10 @@ class MainWindow(QMainWindow):
         # 如果返回空列表或错误信息，不自动请求LLM
         if self._should_skip_llm_request(question_text):
             self.answer_display.setText("未识别到问题，请检查图片内容或手动输入问题。")
+            self._finish_capture(self._capture_token)
             return
 
-        self.get_initial_answer()  # 自动获取答案
+        self.get_initial_answer(self._capture_token)  # 自动获取答案
 
     def _should_skip_llm_request(self, question_text):
         """判断是否应该跳过LLM请求"""
@@ -698,6 +782,7 @@ class MainWindow(QMainWindow):
 
     def on_direct_answer_ready(self, answer_text):
         """处理直接模式的答案结果"""
+        self._finish_capture(self._capture_token)
         self.answer_end_time = time.time()
         self.ocr_end_time = self.answer_end_time  # 直接模式下OCR和答案生成是一起的
         
@@ -712,6 +797,15 @@ class MainWindow(QMainWindow):
 
     def on_answer_ready(self, answer_text):
         """Handles the result from get_answer_from_text."""
+        self._answer_in_flight = False
+        # 截图流程发起的请求完成后即结束该截图流程（即使答案因过期被丢弃）
+        self._finish_capture(self._in_flight_token)
+        self._in_flight_token = None
+        if self._pending_question is not None:
+            # 已有更新的问题在排队，丢弃过期答案
+            self._dispatch_pending_answer()
+            return
+        
         self.answer_end_time = time.time()
         self.answer_display.setText(answer_text)
         
@@ -726,6 +820,16 @@ class MainWindow(QMainWindow):
         print("AI Error:", error_tuple)
         self.answer_display.setText(f"An error occurred: {error_tuple}")
 
+    def _finish_capture(self, capture_token):
+        """
+        截图/识别流程结束，重新允许截图。
+        只有当前截图流程的编号才能结束它；手动请求（编号为None）和过期的编号不影响截图状态。
+        """
+        if capture_token is None or capture_token != self._capture_token:
+            return
+        self._capture_busy = False
+        self.capture_button.setEnabled(True)
+
     def show_result_view(self, initial_question_text=""):
         # 如果已经是展开状态，只更新文本
         if self.is_expanded:
@@ -754,21 +858,17 @@ class MainWindow(QMainWindow):
             self.resize(self.compact_width, self.window_height)
         self.result_view_widget.hide()
 
-    def get_initial_answer(self):
+    def get_initial_answer(self, capture_token=None):
         question = self.question_input.toPlainText()
         if not question.strip() or "Extracting" in question:
+            self._finish_capture(capture_token)
             return
         self.answer_display.setText("Getting answer...")
         
         # 记录答案开始时间
         self.answer_start_time = time.time()
         
-        force_search = is_checkbox_checked(self.force_search_checkbox)
-        
-        worker = Worker(get_answer_from_text, question, force_search=force_search)
-        worker.signals.result.connect(self.on_answer_ready)
-        worker.signals.error.connect(self.on_ai_error)
-        self.threadpool.start(worker)
+        self._request_answer(question, capture_token)
 
     def get_new_answer(self):
         question = self.question_input.toPlainText()
@@ -778,23 +878,55 @@ class MainWindow(QMainWindow):
             
         self.answer_display.setText("Getting new answer...")
         
+        self._request_answer(question)
+
+    def _request_answer(self, question, capture_token=None):
+        """
+        请求答案（get_initial_answer 和 get_new_answer 共用）。
+        若已有请求在进行中，只保留最新的问题，
+        待当前请求完成后再发送，避免旧答案覆盖新答案。
+        capture_token 为发起请求的截图流程编号，手动请求为None。
+        """
+        if self._pending_question is not None:
+            # 被替换的排队问题不会再发送，它所属的截图流程随之结束
+            self._finish_capture(self._pending_question[2])
         force_search = is_checkbox_checked(self.force_search_checkbox)
+        self._pending_question = (question, force_search, capture_token)
+        if not self._answer_in_flight:
+            self._dispatch_pending_answer()
+
+    def _dispatch_pending_answer(self):
+        """发送排队中的最新问题"""
+        question, force_search, capture_token = self._pending_question
+        self._pending_question = None
+        self._answer_in_flight = True
+        self._in_flight_token = capture_token
         
         worker = Worker(get_answer_from_text, question, force_search=force_search)
         worker.signals.result.connect(self.on_answer_ready)
-        worker.signals.error.connect(self.on_ai_error)
+        worker.signals.error.connect(self._on_answer_error)
         self.threadpool.start(worker)
 
+    def _on_answer_error(self, error_tuple):
+        """答案请求出错；若有更新的问题在排队则继续发送"""
+        self._answer_in_flight = False
+        self._finish_capture(self._in_flight_token)
+        self._in_flight_token = None
+        if self._pending_question is not None:
+            self._dispatch_pending_answer()
+            return
+        self.on_ai_error(error_tuple)
+
     def copy_answer(self):
         clipboard = QApplication.clipboard()
         clipboard.setText(self.answer_display.toPlainText())
 
     def animate_size(self, size):
-        self.animation = QPropertyAnimation(self, b"size")
-        self.animation.setDuration(250)
-        self.animation.setEndValue(size)
-        self.animation.setEasingCurve(QEasingCurve.InOutQuart)
-        self.animation.start()
+        # 复用同一个动画对象，并以geometry动画一次性确定位置和大小
+        geometry = self.geometry()
+        self._size_anim.stop()
+        self._size_anim.setEndValue(QRect(geometry.x(), geometry.y(), size.width(), size.height()))
+        self._size_anim.start()
 
     def set_window_pin_state(self, pin_state):
         """设置窗口的置顶状态（主要用于初始化）"""
@@ -811,10 +943,7 @@ class MainWindow(QMainWindow):
             self.toggle_pin()
         else:
             # 状态相同，只更新按钮样式
-            if pin_state:
-                self.pin_button.setStyleSheet(self.base_button_style + "QPushButton { color: green; }")
-            else:
-                self.pin_button.setStyleSheet(self.base_button_style + "QPushButton { color: dimgray; }")
+            self.update_pin_button_style()
     
     def toggle_pin(self):
         """切换窗口置顶状态"""
@@ -823,73 +952,11 @@ class MainWindow(QMainWindow):
         # 更新按钮样式
         self.update_pin_button_style()
         
-        # 在Windows上使用更可靠的方法
-        if sys.platform == 'win32':
-            import ctypes
-            from ctypes import wintypes
-            
-            try:
-                hwnd = int(self.winId())
-                
-                # 保存当前位置和大小
-                current_pos = self.pos()
-                current_size = self.size()
-                
-                if self.is_pinned:
-                    # 设置为置顶窗口
-                    print("Setting window to topmost...")
-                    
-                    # 使用Qt方法设置窗口标志
-                    flags = self.windowFlags()
-                    flags |= Qt.WindowStaysOnTopHint
-                    self.setWindowFlags(flags)
-                    self.show()
-                    
-                    # 使用Windows API强制置顶
-                    result = ctypes.windll.user32.SetWindowPos(
-                        hwnd, -1,  # HWND_TOPMOST
-                        0, 0, 0, 0,
-                        0x0001 | 0x0002 | 0x0040  # SWP_NOSIZE | SWP_NOMOVE | SWP_SHOWWINDOW
-                    )
-                    print(f"Set topmost result: {result}")
-                    
-                else:
-                    # 取消置顶
-                    print("Setting window to normal z-order...")
-                    
-                    # 使用Qt方法移除窗口标志
-                    flags = self.windowFlags()
-                    flags &= ~Qt.WindowStaysOnTopHint
-                    self.setWindowFlags(flags)
-                    self.show()
-                    
-                    # 使用Windows API确保取消置顶
-                    result = ctypes.windll.user32.SetWindowPos(
-                        hwnd, -2,  # HWND_NOTOPMOST
-                        0, 0, 0, 0,
-                        0x0001 | 0x0002 | 0x0040  # SWP_NOSIZE | SWP_NOMOVE | SWP_SHOWWINDOW
-                    )
-                    print(f"Remove topmost result: {result}")
-                
-                # 恢复窗口位置和大小
-                self.resize(current_size)
-                self.move(current_pos)
-                    
-            except Exception as e:
-                print(f"Windows API error: {e}")
-                # 如果API失败，回退到Qt方法
-                self._toggle_pin_qt()
-        else:
-            # 非Windows系统使用Qt方法
-            self._toggle_pin_qt()
-            
-    def _toggle_pin_qt(self):
-        """使用Qt方法切换窗口置顶状态（备用方法）"""
         # 保存当前位置和大小
         current_pos = self.pos()
         current_size = self.size()
-            
-        # 使用Qt标准方法
+        
+        # Qt修改窗口标志时会自动调用SetWindowPos，无需再通过Windows API重复设置
         flags = self.windowFlags()
         if self.is_pinned:
             flags |= Qt.WindowStaysOnTopHint
@@ -900,10 +967,17 @@ class MainWindow(QMainWindow):
         
         # 应用新标志并恢复位置和大小
         self.setWindowFlags(flags)
+        self._hwnd = None  # setWindowFlags会重建原生窗口
         self.show()
         self.resize(current_size)
         self.move(current_pos)
 
+    def _native_hwnd(self):
+        """惰性获取并缓存原生窗口句柄（仅Windows API调用时使用）"""
+        if self._hwnd is None:
+            self._hwnd = int(self.winId())
+        return self._hwnd
+
     def mousePressEvent(self, event):
         if event.button() == Qt.LeftButton:
             # Allow dragging from anywhere on the window
@@ -914,18 +988,31 @@ class MainWindow(QMainWindow):
 
     def mouseMoveEvent(self, event):
         if event.buttons() == Qt.LeftButton and hasattr(self, 'drag_position'):
-            # Move window to new position
-            global_pos = event.globalPosition().toPoint()
-            self.move(global_pos - self.drag_position)
+            # 只记录目标位置，实际移动由定时器按帧率执行，中间的移动事件被合并
+            self._pending_pos = event.globalPosition().toPoint() - self.drag_position
+            if not self._drag_timer.isActive():
+                self._drag_timer.start()
             event.accept()
+
+    def mouseReleaseEvent(self, event):
+        # 松开鼠标时立即应用最后的位置
+        self._flush_drag()
+        super().mouseReleaseEvent(event)
+
+    def _flush_drag(self):
+        """将合并后的拖动位置应用到窗口；没有新的移动时停止定时器"""
+        if self._pending_pos is None:
+            self._drag_timer.stop()
+            return
+        self.move(self._pending_pos)
+        self._pending_pos = None
             
     def showEvent(self, event):
         """窗口显示事件，用于确保窗口在显示后正确设置置顶状态"""
         super().showEvent(event)
         
         # 窗口显示后，使用定时器延迟设置置顶状态，确保窗口完全初始化
-        if sys.platform == 'win32' and self.is_pinned:
-            from PySide6.QtCore import QTimer
+        if _IS_WIN32 and self.is_pinned:
             QTimer.singleShot(100, self._ensure_topmost)  # 延迟100ms执行
             
     def _ensure_topmost(self):
@@ -933,46 +1020,68 @@ class MainWindow(QMainWindow):
         if not self.is_pinned:
             return
             
-        import ctypes
         try:
-            hwnd = int(self.winId())
+            hwnd = self._native_hwnd()
+            
+            # 常见情况：置顶状态未丢失（例如模态对话框关闭后触发showEvent），无需任何操作
+            if _GetWindowLongW(hwnd, GWL_EXSTYLE) & WS_EX_TOPMOST:
+                return
             
             # 多步骤确保窗口置顶
-            print("Ensuring window is topmost...")
+            logger.debug("Ensuring window is topmost...")
             
-            # 1. 设置为TOPMOST
-            result1 = ctypes.windll.user32.SetWindowPos(
-                hwnd, -1,  # HWND_TOPMOST
-                0, 0, 0, 0,
-                0x0001 | 0x0002 | 0x0040  # SWP_NOSIZE | SWP_NOMOVE | SWP_SHOWWINDOW
-            )
+            # 1. 通过延迟窗口定位批量设置为TOPMOST
+            hdwp = _BeginDeferWindowPos(1)
+            if hdwp:
+                hdwp = _DeferWindowPos(
+                    hdwp, hwnd, HWND_TOPMOST,
+                    0, 0, 0, 0,
+                    SWP_NOSIZE | SWP_NOMOVE | SWP_SHOWWINDOW | SWP_NOSENDCHANGING
+                )
+            result1 = bool(hdwp) and bool(_EndDeferWindowPos(hdwp))
             
             # 2. 激活窗口
-            ctypes.windll.user32.SetActiveWindow(hwnd)
+            _SetActiveWindow(hwnd)
             
             # 3. 设置为前台窗口
-            ctypes.windll.user32.SetForegroundWindow(hwnd)
-            
-            # 4. 再次确认TOPMOST
-            result2 = ctypes.windll.user32.SetWindowPos(
-                hwnd, -1,  # HWND_TOPMOST
-                0, 0, 0, 0,
-                0x0001 | 0x0002 | 0x0010  # SWP_NOSIZE | SWP_NOMOVE | SWP_NOACTIVATE
-            )
+            _SetForegroundWindow(hwnd)
             
-            print(f"Ensure topmost results: {result1}, {result2}")
-            
-            # 验证窗口状态
-            ex_style = ctypes.windll.user32.GetWindowLongW(hwnd, -20)  # GWL_EXSTYLE
-            is_topmost = (ex_style & 0x00000008) != 0  # WS_EX_TOPMOST
-            print(f"Window topmost status: {is_topmost}")
+            # 4. 仅在激活后丢失TOPMOST时再次设置
+            ex_style = _GetWindowLongW(hwnd, GWL_EXSTYLE)
+            is_topmost = (ex_style & WS_EX_TOPMOST) != 0
+            if not is_topmost:
+                result2 = _SetWindowPos(
+                    hwnd, HWND_TOPMOST,
+                    0, 0, 0, 0,
+                    SWP_NOSIZE | SWP_NOMOVE | SWP_NOACTIVATE | SWP_NOSENDCHANGING
+                )
+                logger.debug("Ensure topmost results: %s, %s", result1, result2)
+            else:
+                logger.debug("Ensure topmost result: %s", result1)
             
         except Exception as e:
-            print(f"Ensure topmost error: {e}")
+            logger.warning("Ensure topmost error: %s", e)
             
     def show_knowledge_base(self):
         """Switch to knowledge base tab"""
         self.tab_widget.setCurrentIndex(1)  # Switch to knowledge base tab
+
+    def _maybe_init_kb(self, index):
+        """首次切换到知识库标签页时创建知识库面板"""
+        if index != 1 or self.knowledge_base_tab is not self._kb_placeholder:
+            return
+        
+        self.tab_widget.setUpdatesEnabled(False)
+        try:
+            panel_cls, _ = _kb_classes()
+            self.knowledge_base_tab = panel_cls()
+            # 替换占位控件（会再次触发currentChanged，此时面板已创建直接返回）
+            self.tab_widget.removeTab(1)
+            self.tab_widget.insertTab(1, self.knowledge_base_tab, "知识库")
+            self.tab_widget.setCurrentIndex(1)
+            self._kb_placeholder.deleteLater()
+        finally:
+            self.tab_widget.setUpdatesEnabled(True)
     
     def upload_quiz_history_async(self, question_text, answer_text):
         """异步上传测验历史记录"""
@@ -1052,28 +1161,28 @@ class MainWindow(QMainWindow):
     def show_settings(self):
         """Shows the settings dialog"""
         # Create a menu to choose between general settings and knowledge base settings
-        from PySide6.QtWidgets import QMenu
-        from PySide6.QtCore import QPoint
-        
-        menu = QMenu(self)
-        general_action = menu.addAction("常规设置")
-        kb_action = menu.addAction("知识库设置")
-        history_action = menu.addAction("历史记录设置")
+        # 菜单只创建一次，之后复用
+        if self._settings_menu is None:
+            self._settings_menu = QMenu(self)
+            self._general_action = self._settings_menu.addAction("常规设置")
+            self._kb_action = self._settings_menu.addAction("知识库设置")
+            self._history_action = self._settings_menu.addAction("历史记录设置")
         
         # Show menu at button position
         button_pos = self.settings_button.mapToGlobal(QPoint(0, self.settings_button.height()))
-        action = menu.exec(button_pos)
+        action = self._settings_menu.exec(button_pos)
         
-        if action == general_action:
+        if action == self._general_action:
             dialog = SettingsDialog(self)
             if dialog.exec():
                 # Save settings if dialog was accepted
                 settings = dialog.get_settings()
                 save_app_config(settings)
-        elif action == kb_action:
-            dialog = KnowledgeBaseSettingsDialog(self)
+        elif action == self._kb_action:
+            _, settings_dialog_cls = _kb_classes()
+            dialog = settings_dialog_cls(self)
             dialog.exec()
-        elif action == history_action:
+        elif action == self._history_action:
             dialog = HistorySettingsDialog(self)
             if dialog.exec():
                 # Save settings if dialog was accepted
@@ -1082,6 +1191,7 @@ class MainWindow(QMainWindow):
                 save_backend_config(settings)
 
 if __name__ == '__main__':
+    from PySide6.QtWidgets import QStyleFactory
     app = QApplication(sys.argv)
     app.setStyle(QStyleFactory.create("Fusion")) 
     window = MainWindow()
@@ -3,10 +3,16 @@
 提供健壮的复选框状态处理方法，解决跨平台兼容性问题
 """
 
+import logging
 from PySide6.QtWidgets import QCheckBox
 from PySide6.QtCore import Qt
 from typing import Union, Any
 
+logger = logging.getLogger(__name__)
+
+# Qt.CheckState.Checked 对应的整数值（Qt中固定为2）
+_CHECKED_STATE_VALUE = 2
+
 
 class CheckboxStateHandler:
     """复选框状态处理工具类"""
@@ -22,22 +28,22 @@ class CheckboxStateHandler:
         Returns:
             bool: 是否选中
         """
-        try:
-            if isinstance(checkbox_or_state, QCheckBox):
-                # 直接从复选框对象获取状态（推荐方式）
-                return checkbox_or_state.isChecked()
-            elif isinstance(checkbox_or_state, int):
-                # 处理stateChanged信号的整数参数
-                return CheckboxStateHandler._is_checked_from_int_state(checkbox_or_state)
-            elif hasattr(checkbox_or_state, 'value'):
-                # 处理Qt.CheckState枚举
-                return checkbox_or_state == Qt.CheckState.Checked
-            else:
-                # 其他类型，尝试转换为布尔值
-                return bool(checkbox_or_state)
-        except Exception as e:
-            print(f"复选框状态检查失败: {e}")
-            return False  # 默认返回未选中状态
+        # 绝大多数调用传入的是QCheckBox，先用类型恒等判断走快速路径
+        value_type = type(checkbox_or_state)
+        if value_type is QCheckBox:
+            # 直接从复选框对象获取状态（推荐方式）
+            return checkbox_or_state.isChecked()
+        if value_type is int:
+            # 处理stateChanged信号的整数参数
+            return checkbox_or_state == _CHECKED_STATE_VALUE
+        if value_type is Qt.CheckState:
+            # 处理Qt.CheckState枚举
+            return checkbox_or_state == Qt.CheckState.Checked
+        if isinstance(checkbox_or_state, QCheckBox):
+            # QCheckBox子类
+            return checkbox_or_state.isChecked()
+        # 其他类型，尝试转换为布尔值
+        return bool(checkbox_or_state)
     
     @staticmethod
     def _is_checked_from_int_state(state: int) -> bool:
@@ -50,22 +56,7 @@ class CheckboxStateHandler:
         Returns:
             bool: 是否选中
         """
-        try:
-            # 方法1: 与Qt.CheckState.Checked的值比较
-            if hasattr(Qt.CheckState, 'Checked'):
-                checked_value = Qt.CheckState.Checked.value if hasattr(Qt.CheckState.Checked, 'value') else Qt.CheckState.Checked
-                if state == checked_value:
-                    return True
-            
-            # 方法2: 直接数值比较（备用）
-            if state == 2:
-                return True
-                
-            return False
-        except Exception as e:
-            print(f"整数状态检查失败: {e}")
-            # 最后的备用方案
-            return state == 2
+        return state == _CHECKED_STATE_VALUE
     
     @staticmethod
     def get_checkbox_state_robust(checkbox: QCheckBox) -> tuple[bool, str]:
@@ -91,7 +82,7 @@ class CheckboxStateHandler:
         try:
             # 方法2: 使用checkState()
             check_state = checkbox.checkState()
-            is_checked_state = CheckboxStateHandler._is_checked_from_int_state(check_state)
+            is_checked_state = CheckboxStateHandler.is_checked_safe(check_state)
             debug_info.append(f"checkState(): {check_state} -> {is_checked_state}")
         except Exception as e:
             is_checked_state = None
@@ -108,7 +99,9 @@ class CheckboxStateHandler:
             final_result = False
             debug_info.append("所有方法失败，默认为 False")
         
-        return final_result, "; ".join(debug_info)
+        debug_text = "; ".join(debug_info)
+        logger.debug("复选框状态: %s", debug_text)
+        return final_result, debug_text
     
     @staticmethod
     def setup_checkbox_connection_safe(checkbox: QCheckBox, callback_func):
@@ -123,7 +116,7 @@ class CheckboxStateHandler:
             # 推荐方式：连接到不带参数的回调函数
             checkbox.stateChanged.connect(callback_func)
         except Exception as e:
-            print(f"复选框信号连接失败: {e}")
+            logger.warning("复选框信号连接失败: %s", e)
     
     @staticmethod
     def setup_checkbox_connection_with_state(checkbox: QCheckBox, callback_func):
@@ -140,7 +133,7 @@ class CheckboxStateHandler:
                 lambda state: callback_func(CheckboxStateHandler.is_checked_safe(state))
             )
         except Exception as e:
-            print(f"复选框信号连接失败: {e}")
+            logger.warning("复选框信号连接失败: %s", e)
 
 
 # 便捷函数
@@ -1,40 +1,159 @@
-import configparser
+import functools
+import io
+import logging
 import os
-from typing import Dict, Optional, Any
+import re
+import tempfile
+from typing import Dict, Optional, Any, Tuple
 import sys
+import threading
+from collections.abc import Mapping
+from dataclasses import dataclass
 
-def safe_read_config(config: configparser.ConfigParser, config_path: str) -> bool:
+logger = logging.getLogger(__name__)
+
+# 与 configparser 的 getboolean 保持一致的布尔值写法
+_BOOLEAN_STATES = {
+    '1': True, 'yes': True, 'true': True, 'on': True,
+    '0': False, 'no': False, 'false': False, 'off': False,
+}
+
+# config.ini.example 中模型API密钥的占位值，检测到即视为未配置
+_MODEL_KEY_PLACEHOLDERS = {
+    'vlm': 'YOUR_VLM_API_KEY_HERE',
+    'llm': 'YOUR_LLM_API_KEY_HERE',
+}
+
+# embedding/reranker API密钥占位值中的片段（小写），如 your_embedding_api_key_here
+_API_KEY_PLACEHOLDER_TOKENS = ('your_', 'api_key_here')
+
+def _is_api_key_placeholder(api_key: str) -> bool:
+    """判断API密钥是否仍为示例占位值（不区分大小写）"""
+    api_key_l = api_key.lower()
+    return any(token in api_key_l for token in _API_KEY_PLACEHOLDER_TOKENS)
+
+class _ConfigRecord:
     """
-    安全地读取配置文件，处理编码问题
+    配置对象的公共基类。配置对象是不可变的 dataclass，可以安全地缓存和共享；
+    同时实现只读 Mapping 的接口（get/[]/in/keys/items/values/len/迭代），兼容原先返回 dict 的调用方，
+    与内容相同的 dict 比较相等，dict(obj) 可得到可修改的副本。
     
-    Args:
-        config: ConfigParser实例
-        config_path: 配置文件路径
-        
-    Returns:
-        bool: 是否成功读取
+    _OPTIONAL_KEYS 中的字段值为 None 时视为该键不存在，与原先 dict 中省略这些键的行为一致。
     """
-    try:
-        # 首先尝试UTF-8编码
-        config.read(config_path, encoding='utf-8')
-        return True
-    except UnicodeDecodeError:
-        try:
-            # 如果UTF-8失败，尝试GBK编码
-            config.read(config_path, encoding='gbk')
-            return True
-        except UnicodeDecodeError:
-            try:
-                # 最后尝试系统默认编码
-                config.read(config_path)
-                return True
-            except Exception as e:
-                print(f"Error reading config file {config_path}: {e}")
-                return False
-    except Exception as e:
-        print(f"Error reading config file {config_path}: {e}")
-        return False
+    __slots__ = ()
+    _OPTIONAL_KEYS: Tuple[str, ...] = ()
+    
+    def _has(self, key: str) -> bool:
+        if key not in self.__dataclass_fields__:
+            return False
+        return key not in self._OPTIONAL_KEYS or getattr(self, key) is not None
+    
+    def get(self, key: str, default: Any = None) -> Any:
+        return getattr(self, key) if self._has(key) else default
+    
+    def __getitem__(self, key: str) -> Any:
+        if not self._has(key):
+            raise KeyError(key)
+        return getattr(self, key)
+    
+    def __contains__(self, key: str) -> bool:
+        return self._has(key)
+    
+    def keys(self):
+        return [key for key in self.__dataclass_fields__ if self._has(key)]
+    
+    def values(self):
+        return [getattr(self, key) for key in self.keys()]
+    
+    def items(self):
+        return [(key, getattr(self, key)) for key in self.keys()]
+    
+    def __iter__(self):
+        return iter(self.keys())
+    
+    def __len__(self) -> int:
+        return len(self.keys())
+    
+    def __eq__(self, other) -> bool:
+        if isinstance(other, (_ConfigRecord, Mapping)):
+            return dict(self.items()) == dict(other.items())
+        return NotImplemented
+    
+    def __hash__(self) -> int:
+        return hash(tuple(self.items()))
+
+
+@dataclass(frozen=True, slots=True, eq=False)
+class AppSettings(_ConfigRecord):
+    """[app] 配置"""
+    screen_number: int = 1
+
+
+@dataclass(frozen=True, slots=True, eq=False)
+class ModelSettings(_ConfigRecord):
+    """[vlm] / [llm] 配置"""
+    _OPTIONAL_KEYS = ('llm_provider', 'google_api_key')
+    
+    api_key: str
+    model_name: str
+    base_url: Optional[str] = None
+    proxy: Optional[str] = None
+    llm_provider: Optional[str] = None
+    google_api_key: Optional[str] = None
+
+
+@dataclass(frozen=True, slots=True, eq=False)
+class KnowledgeBaseSettings(_ConfigRecord):
+    """[knowledge_base] 配置"""
+    enabled: bool = False
+    storage_path: str = './data/knowledge_base'
+    max_file_size_mb: int = 100
+    chunk_size: int = 1000
+    chunk_overlap: int = 200
+    max_collections: int = 50
+    background_processing: bool = True
+    max_concurrent_tasks: int = 3
+
+
+@dataclass(frozen=True, slots=True, eq=False)
+class ChromaDBSettings(_ConfigRecord):
+    """[chromadb] 配置"""
+    connection_type: str = 'local'
+    host: Optional[str] = None
+    port: Optional[int] = None
+    path: str = './data/chromadb'
+    auth_token: Optional[str] = None
+    ssl_enabled: bool = False
+
+
+@dataclass(frozen=True, slots=True, eq=False)
+class APISettings(_ConfigRecord):
+    """[embedding_api] / [reranker_api] 配置"""
+    endpoint: str
+    api_key: str
+    model: str
+    timeout: int = 30
+
 
+@dataclass(frozen=True, slots=True, eq=False)
+class BackendSettings(_ConfigRecord):
+    """[backend] 配置"""
+    base_url: str = 'http://localhost:8000'
+    enable_history: bool = False
+    user_id: str = ''
+
+
+# 缺少对应配置节时返回的默认配置（不可变，所有调用共享同一对象），
+# 同时作为各配置项缺失时的默认值
+_DEFAULT_APP = AppSettings()
+_DEFAULT_KB = KnowledgeBaseSettings()
+_DEFAULT_CHROMADB = ChromaDBSettings()
+_DEFAULT_BACKEND = BackendSettings()
+
+# [chromadb] 存在但未填写端口时使用的默认端口
+_DEFAULT_CHROMADB_PORT = 8000
+
+@functools.lru_cache(maxsize=1)
 def get_config_path() -> str:
     """
     获取 config.ini 的绝对路径，智能适应开发环境和 PyInstaller 打包环境。
@@ -54,33 +173,282 @@ def get_config_path() -> str:
         # 沿用您原来的逻辑，配置文件在上一级目录
         return os.path.abspath(os.path.join(script_dir, '..', 'config.ini'))
 
-def get_app_config():
+# 配置文件路径在进程内不变，导入时计算并规范化一次，所有函数共用
+_CONFIG_PATH = os.path.normpath(get_config_path())
+
+def _decode_config_bytes(data: bytes) -> str:
     """
-    Reads the application configuration from the config.ini file.
+    解码配置文件内容，处理编码问题：依次尝试UTF-8、GBK和系统默认编码
+    """
+    try:
+        return data.decode('utf-8-sig')
+    except UnicodeDecodeError:
+        pass
+    try:
+        return data.decode('gbk')
+    except UnicodeDecodeError:
+        import locale
+        return data.decode(locale.getpreferredencoding(False))
+
+def _read_config_file(config_path: str) -> Tuple[str, int]:
+    """
+    一次性读取整个配置文件：open、fstat、按文件大小read，不经过缓冲IO。
     
+    Args:
+        config_path: 配置文件路径
+        
     Returns:
-        dict: A dictionary containing application configuration details.
+        tuple: (解码后的文本, 读取时fstat得到的文件签名，见 _config_sig)
     """
-    config = configparser.ConfigParser()
-    config_path = get_config_path()
+    fd = os.open(config_path, os.O_RDONLY | getattr(os, 'O_BINARY', 0))
+    try:
+        st = os.fstat(fd)
+        data = os.read(fd, st.st_size)
+        # 普通文件一次read即可读完；仅在出现短读时继续读取
+        while len(data) < st.st_size:
+            chunk = os.read(fd, st.st_size - len(data))
+            if not chunk:
+                break
+            data += chunk
+    finally:
+        os.close(fd)
+    return _decode_config_bytes(data), _config_sig(st)
+
+# 配置节标题行，如 [knowledge_base]
+_SECTION_HEADER_RE = re.compile(r'^[ \t]*\[(.*)\][ \t]*\r?$', re.M)
+
+def _parse_section_body(body: str, section: Dict[str, str]) -> bool:
+    """
+    解析一个配置节标题之后的内容，将键值写入 section。
+    只支持本项目用到的INI子集：key = value 或 key: value、
+    以 # 或 ; 开头的整行注释。键名与 configparser 一样统一转为小写。
     
-    if not os.path.exists(config_path):
-        print(f"Error: config.ini not found at {config_path}")
-        return {}
+    Args:
+        body: 配置节内容（不含标题行）
+        section: 接收解析结果的字典
+        
+    Returns:
+        bool: 遇到不支持的写法（缩进的续行、没有分隔符的行）时返回False，由调用方改用 configparser 解析
+    """
+    for line in body.splitlines():
+        stripped = line.strip()
+        if not stripped or stripped[0] in '#;':
+            continue
+        if line[0] in ' \t':
+            # 缩进的行在 configparser 中是上一个值的续行
+            return False
+        # 与 configparser 相同，以最先出现的 = 或 : 作为分隔符
+        eq, colon = stripped.find('='), stripped.find(':')
+        sep = colon if eq == -1 or (colon != -1 and colon < eq) else eq
+        if sep <= 0:
+            return False
+        section[stripped[:sep].strip().lower()] = stripped[sep + 1:].strip()
+    return True
+
+def _has_content(text: str) -> bool:
+    """判断文本中是否有注释和空行以外的内容"""
+    return any(line.strip() and line.strip()[0] not in '#;' for line in text.splitlines())
+
+class _LazyConfig:
+    """
+    按需解析的 config.ini 内容。
+    构造时只定位各配置节标题的位置，某个配置节在首次被访问时才解析，
+    之后的访问直接使用已解析的结果。
+    文件中出现快速解析不支持的写法（[DEFAULT] 继承、多行续行值等）时，
+    整个文件改用 configparser 解析，保证结果与 configparser 一致。
+    """
+    __slots__ = ('_text', '_spans', '_parsed', '_fallback')
+    
+    def __init__(self, text: str):
+        self._text = text
+        self._spans: Dict[str, list] = {}
+        self._parsed: Dict[str, Dict[str, str]] = {}
+        self._fallback = False
+        headers = list(_SECTION_HEADER_RE.finditer(text))
+        for i, match in enumerate(headers):
+            end = headers[i + 1].start() if i + 1 < len(headers) else len(text)
+            # 同名配置节出现多次时合并，与 configparser 的行为一致
+            self._spans.setdefault(match.group(1), []).append((match.end(), end))
+        
+        # [DEFAULT] 的继承和首个配置节之前的内容只有 configparser 能按原语义处理
+        preamble = text[:headers[0].start()] if headers else text
+        if 'DEFAULT' in self._spans or _has_content(preamble):
+            self._parse_with_configparser()
+    
+    def _new_parser(self):
+        import configparser
+        # 与快速解析保持一致：不做插值，重复的键以最后一次为准
+        return configparser.ConfigParser(interpolation=None, strict=False)
+    
+    def _parse_with_configparser(self):
+        """用 configparser 解析整个文件，解析失败时抛出 _ConfigReadError"""
+        import configparser
+        parser = self._new_parser()
+        try:
+            parser.read_string(self._text)
+        except configparser.Error as e:
+            raise _ConfigReadError(str(e)) from e
+        self._fallback = True
+        self._parsed = {name: dict(parser[name]) for name in parser.sections()}
+        self._spans = dict.fromkeys(self._parsed)
+    
+    def __contains__(self, name: str) -> bool:
+        return name in self._spans
+    
+    def __getitem__(self, name: str) -> Dict[str, str]:
+        section = self._parsed.get(name)
+        if section is None:
+            section = {}
+            for start, end in self._spans[name]:
+                if not _parse_section_body(self._text[start:end], section):
+                    self._parse_with_configparser()
+                    return self._parsed.get(name, {})
+            self._parsed[name] = section
+        return section
+    
+    def get(self, name: str, default=None):
+        return self[name] if name in self._spans else default
+    
+    def to_dict(self) -> Dict[str, Dict[str, str]]:
+        """解析全部配置节，返回 {section: {key: value}}"""
+        return {name: self[name] for name in self._spans}
+    
+    def to_parser(self):
+        """
+        构建包含当前全部内容的 ConfigParser，供保存时修改后写回。
+        改用 configparser 解析的文件直接读取原文，保留 [DEFAULT] 节和多行值。
+        """
+        parser = self._new_parser()
+        # 先解析全部配置节：遇到不支持的写法时会在这里切换为 configparser 解析
+        sections = self.to_dict()
+        if self._fallback:
+            parser.read_string(self._text)
+        else:
+            parser.read_dict(sections)
+        return parser
+
+def _as_int(value: Optional[str], default: Optional[int]) -> Optional[int]:
+    """将配置字符串转换为整数，缺失或无法解析时返回默认值"""
+    if value is None:
+        return default
+    try:
+        return int(value)
+    except ValueError:
+        return default
+
+def _nn(value: Optional[str]) -> Optional[str]:
+    """将缺失或空字符串的配置值统一为None（解析时值已去除首尾空白）"""
+    return value or None
+
+def _as_bool(value: Optional[str], default: bool) -> bool:
+    """将配置字符串转换为布尔值，缺失或无法识别时返回默认值"""
+    if value is None:
+        return default
+    # 解析时值已去除首尾空白，这里只需统一大小写
+    return _BOOLEAN_STATES.get(value.lower(), default)
+
+def _config_sig(st: os.stat_result) -> Tuple[int, int, int]:
+    """
+    由文件状态生成缓存签名 (st_mtime_ns, st_size, st_ino)。
+    文件被替换（如原子保存）或大小变化时，即使修改时间相同签名也会不同。
+    """
+    return (st.st_mtime_ns, st.st_size, st.st_ino)
+
+# 已解析配置的缓存（所有get_*函数共用），按文件签名失效
+_config_cache = {'sig': None, 'sections': None}
+_config_lock = threading.Lock()
+
+class _ConfigReadError(Exception):
+    """config.ini 存在但读取失败。以异常形式抛出，lru_cache 不会缓存这次失败"""
+
+def _stat_config() -> Optional[os.stat_result]:
+    """
+    对 config.ini 执行一次stat，同时完成存在性检查和缓存校验所需的信息获取。
+    
+    Returns:
+        os.stat_result: 文件状态；文件不存在时返回None
+    """
+    try:
+        return os.stat(_CONFIG_PATH)
+    except FileNotFoundError:
+        return None
+
+def _load_cached_config(sig: Tuple[int, int, int]) -> Optional[_LazyConfig]:
+    """
+    返回已解析的配置，仅在 config.ini 的文件签名变化时重新读取。
+    返回的对象被所有调用方共享，调用方不应修改它。
+    
+    Args:
+        sig: _config_sig() 得到的文件签名
         
-    if not safe_read_config(config, config_path):
+    Returns:
+        _LazyConfig: 按需解析的配置；读取失败时返回None
+    """
+    # 后台预热与前台调用可能同时到达，持锁保证同一份文件只解析一次
+    with _config_lock:
+        if _config_cache['sections'] is None or _config_cache['sig'] != sig:
+            try:
+                # 以读取时fstat得到的签名作为缓存键，与实际读到的内容对应
+                text, read_sig = _read_config_file(_CONFIG_PATH)
+                sections = _LazyConfig(text)
+            except Exception as e:
+                print(f"Error reading config file {_CONFIG_PATH}: {e}")
+                return None
+            _config_cache['sections'] = sections
+            _config_cache['sig'] = read_sig
+        return _config_cache['sections']
+
+def _require_config(sig: Tuple[int, int, int]) -> _LazyConfig:
+    """
+    供带缓存的 get_*_config 实现使用：返回已解析的配置，读取失败时抛出 _ConfigReadError。
+    """
+    config = _load_cached_config(sig)
+    if config is None:
+        raise _ConfigReadError()
+    return config
+
+def _call_cached(cached_fn, default, *args):
+    """
+    stat一次 config.ini，以文件签名作为缓存键调用带 lru_cache 的实现。
+    文件修改后缓存键随之变化，旧结果自然失效。
+    
+    Args:
+        cached_fn: 带 lru_cache 的实现，最后一个参数为文件签名
+        default: 文件不存在或读取失败时的返回值
+        *args: 传给 cached_fn 的其余参数
+    """
+    config_path = _CONFIG_PATH
+    
+    st = _stat_config()
+    if st is None:
+        print(f"Error: config.ini not found at {config_path}")
+        return default
+    
+    try:
+        return cached_fn(*args, _config_sig(st))
+    except _ConfigReadError:
         print(f"Error: Failed to read config.ini at {config_path}")
-        return {}
+        return default
+
+def get_app_config():
+    """
+    Reads the application configuration from the config.ini file.
     
-    # Get app settings with defaults
-    if 'app' not in config:
-        config.add_section('app')
+    Returns:
+        AppSettings: The application configuration; supports dict-style get().
+                     An empty dict is returned if config.ini is missing or unreadable.
+    """
+    app_config = _call_cached(_get_app_config_cached, None)
+    return app_config if app_config is not None else {}
+
+@functools.lru_cache(maxsize=4)
+def _get_app_config_cached(sig: Tuple[int, int, int]) -> AppSettings:
+    config = _require_config(sig)
     
-    screen_number = config.getint('app', 'screen_number', fallback=1)
+    # Get app settings with defaults (also covers a missing [app] section)
+    screen_number = _as_int(config.get('app', {}).get('screen_number'), _DEFAULT_APP.screen_number)
     
-    return {
-        'screen_number': screen_number
-    }
+    return AppSettings(screen_number=screen_number)
 
 def save_app_config(config_data):
     """
@@ -89,69 +457,46 @@ def save_app_config(config_data):
     Args:
         config_data (dict): A dictionary containing application configuration details.
     """
-    config = configparser.ConfigParser()
-    config_path = get_config_path()
-    
-    if os.path.exists(config_path):
-        config.read(config_path)
-    
-    if 'app' not in config:
-        config.add_section('app')
-    
-    # Update app settings
-    if 'screen_number' in config_data:
-        config.set('app', 'screen_number', str(config_data['screen_number']))
-    
-    # Write to file
-    with open(config_path, 'w') as configfile:
-        config.write(configfile)
+    save_section('app', config_data)
 
 def get_model_config(service_type):
     """
     Reads the model configuration from the config.ini file for a specific service.
+    The result is cached until config.ini changes and is shared between callers.
 
     Args:
         service_type (str): The type of service, either 'vlm' or 'llm'.
 
     Returns:
-        dict: A dictionary containing model configuration details.
-              Returns None if the section is not found or a required key is missing.
+        ModelSettings: The model configuration; supports dict-style get() and [].
+                       Returns None if the section is not found or a required key is missing.
     """
     if service_type not in ['vlm', 'llm']:
         raise ValueError("service_type must be either 'vlm' or 'llm'")
 
-    config = configparser.ConfigParser()
-    config_path = get_config_path()
-    
-    if not os.path.exists(config_path):
-        print(f"Error: config.ini not found at {config_path}")
-        return None
-        
-    if not safe_read_config(config, config_path):
-        print(f"Error: Failed to read config.ini at {config_path}")
-        return None
+    return _call_cached(_get_model_config_cached, None, service_type)
+
+@functools.lru_cache(maxsize=8)
+def _get_model_config_cached(service_type: str, sig: Tuple[int, int, int]) -> Optional[ModelSettings]:
+    config = _require_config(sig)
 
     if service_type not in config:
         print(f"Error: Section [{service_type}] not found in config.ini.")
         return None
 
-    api_key = config.get(service_type, 'api_key', fallback=None)
-    model_name = config.get(service_type, 'model_name', fallback=None)
-    base_url = config.get(service_type, 'base_url', fallback=None)
-    proxy = config.get(service_type, 'proxy', fallback=None)
+    section = config[service_type]
+    api_key = section.get('api_key')
+    model_name = section.get('model_name')
+    # Treat an empty string for base_url or proxy as None
+    base_url = _nn(section.get('base_url'))
+    proxy = _nn(section.get('proxy'))
     llm_provider = None
     google_api_key = None
     if service_type == 'llm':
-        llm_provider = config.get('llm', 'llm_provider', fallback='gemini')
-        google_api_key = config.get('llm', 'google_api_key', fallback=None)
-
-    # Treat an empty string for base_url or proxy as None
-    if base_url is not None and not base_url.strip():
-        base_url = None
-    if proxy is not None and not proxy.strip():
-        proxy = None
+        llm_provider = section.get('llm_provider', 'gemini')
+        google_api_key = section.get('google_api_key')
 
-    if not api_key or f'YOUR_{service_type.upper()}_API_KEY_HERE' in api_key:
+    if not api_key or _MODEL_KEY_PLACEHOLDERS[service_type] in api_key:
         print(f"Error: API key for [{service_type}] not set in config.ini.")
         return None
     
@@ -159,254 +504,327 @@ def get_model_config(service_type):
         print(f"Error: model_name for [{service_type}] not set in config.ini.")
         return None
 
-    config_data = {
-        'api_key': api_key,
-        'model_name': model_name,
-        'base_url': base_url,
-        'proxy': proxy
-    }
-
-    if llm_provider:
-        config_data['llm_provider'] = llm_provider
-    if google_api_key:
-        config_data['google_api_key'] = google_api_key
+    return ModelSettings(
+        api_key=api_key,
+        model_name=model_name,
+        base_url=base_url,
+        proxy=proxy,
+        llm_provider=llm_provider or None,
+        google_api_key=google_api_key or None
+    )
 
-    return config_data
 
-
-def get_knowledge_base_config() -> Optional[Dict[str, Any]]:
+def get_knowledge_base_config() -> Optional[KnowledgeBaseSettings]:
     """
     Reads the knowledge base configuration from the config.ini file.
     
     Returns:
-        dict: A dictionary containing knowledge base configuration details.
-              Returns None if the section is not found.
+        KnowledgeBaseSettings: The knowledge base configuration; supports dict-style get() and [].
+                               Returns None if config.ini is missing or unreadable.
     """
-    config = configparser.ConfigParser()
-    config_path = get_config_path()
-    
-    if not os.path.exists(config_path):
-        print(f"Error: config.ini not found at {config_path}")
-        return None
-        
-    config.read(config_path)
+    return _call_cached(_get_knowledge_base_config_cached, None)
+
+@functools.lru_cache(maxsize=4)
+def _get_knowledge_base_config_cached(sig: Tuple[int, int, int]) -> KnowledgeBaseSettings:
+    config = _require_config(sig)
     
     if 'knowledge_base' not in config:
         print("Warning: [knowledge_base] section not found in config.ini. Using defaults.")
-        return {
-            'enabled': False,
-            'storage_path': './data/knowledge_base',
-            'max_file_size_mb': 100,
-            'chunk_size': 1000,
-            'chunk_overlap': 200,
-            'max_collections': 50,
-            'background_processing': True,
-            'max_concurrent_tasks': 3
-        }
-    
-    return {
-        'enabled': config.getboolean('knowledge_base', 'enabled', fallback=False),
-        'storage_path': config.get('knowledge_base', 'storage_path', fallback='./data/knowledge_base'),
-        'max_file_size_mb': config.getint('knowledge_base', 'max_file_size_mb', fallback=100),
-        'chunk_size': config.getint('knowledge_base', 'chunk_size', fallback=1000),
-        'chunk_overlap': config.getint('knowledge_base', 'chunk_overlap', fallback=200),
-        'max_collections': config.getint('knowledge_base', 'max_collections', fallback=50),
-        'background_processing': config.getboolean('knowledge_base', 'background_processing', fallback=True),
-        'max_concurrent_tasks': config.getint('knowledge_base', 'max_concurrent_tasks', fallback=3)
-    }
-
-
-def get_chromadb_config() -> Optional[Dict[str, Any]]:
+        return _DEFAULT_KB
+    
+    section = config['knowledge_base']
+    defaults = _DEFAULT_KB
+    return KnowledgeBaseSettings(
+        enabled=_as_bool(section.get('enabled'), defaults.enabled),
+        storage_path=section.get('storage_path', defaults.storage_path),
+        max_file_size_mb=_as_int(section.get('max_file_size_mb'), defaults.max_file_size_mb),
+        chunk_size=_as_int(section.get('chunk_size'), defaults.chunk_size),
+        chunk_overlap=_as_int(section.get('chunk_overlap'), defaults.chunk_overlap),
+        max_collections=_as_int(section.get('max_collections'), defaults.max_collections),
+        background_processing=_as_bool(section.get('background_processing'), defaults.background_processing),
+        max_concurrent_tasks=_as_int(section.get('max_concurrent_tasks'), defaults.max_concurrent_tasks)
+    )
+
+
+def get_chromadb_config() -> Optional[ChromaDBSettings]:
     """
     Reads the ChromaDB configuration from the config.ini file.
     
     Returns:
-        dict: A dictionary containing ChromaDB configuration details.
-              Returns None if the section is not found.
+        ChromaDBSettings: The ChromaDB configuration; supports dict-style get() and [].
+                          Returns None if config.ini is missing or unreadable.
     """
-    config = configparser.ConfigParser()
-    config_path = get_config_path()
-    
-    if not os.path.exists(config_path):
-        print(f"Error: config.ini not found at {config_path}")
-        return None
-        
-    config.read(config_path)
+    return _call_cached(_get_chromadb_config_cached, None)
+
+@functools.lru_cache(maxsize=4)
+def _get_chromadb_config_cached(sig: Tuple[int, int, int]) -> ChromaDBSettings:
+    config = _require_config(sig)
     
     if 'chromadb' not in config:
         print("Warning: [chromadb] section not found in config.ini. Using local defaults.")
-        return {
-            'connection_type': 'local',
-            'host': None,
-            'port': None,
-            'path': './data/chromadb',
-            'auth_token': None,
-            'ssl_enabled': False
-        }
-    
-    connection_type = config.get('chromadb', 'connection_type', fallback='local')
-    host = config.get('chromadb', 'host', fallback=None)
-    port_str = config.get('chromadb', 'port', fallback='')
-    port = config.getint('chromadb', 'port', fallback=8000) if port_str else 8000
-    path = config.get('chromadb', 'path', fallback='./data/chromadb')
-    auth_token = config.get('chromadb', 'auth_token', fallback=None)
-    ssl_enabled = config.getboolean('chromadb', 'ssl_enabled', fallback=False)
-    
-    # Clean up empty strings
-    if host is not None and not host.strip():
-        host = None
-    if auth_token is not None and not auth_token.strip():
-        auth_token = None
-    
-    return {
-        'connection_type': connection_type,
-        'host': host,
-        'port': port,
-        'path': path,
-        'auth_token': auth_token,
-        'ssl_enabled': ssl_enabled
-    }
-
-
-def get_api_config(api_type: str) -> Optional[Dict[str, Any]]:
+        return _DEFAULT_CHROMADB
+    
+    section = config['chromadb']
+    defaults = _DEFAULT_CHROMADB
+    connection_type = section.get('connection_type', defaults.connection_type)
+    host = _nn(section.get('host'))
+    port = _as_int(section.get('port'), _DEFAULT_CHROMADB_PORT)
+    path = section.get('path', defaults.path)
+    auth_token = _nn(section.get('auth_token'))
+    ssl_enabled = _as_bool(section.get('ssl_enabled'), defaults.ssl_enabled)
+    
+    return ChromaDBSettings(
+        connection_type=connection_type,
+        host=host,
+        port=port,
+        path=path,
+        auth_token=auth_token,
+        ssl_enabled=ssl_enabled
+    )
+
+
+def get_api_config(api_type: str) -> Optional[APISettings]:
     """
     Reads the API configuration from the config.ini file for embedding or reranker APIs.
+    The result is cached until config.ini changes and is shared between callers.
     
     Args:
         api_type (str): The type of API, either 'embedding_api' or 'reranker_api'.
     
     Returns:
-        dict: A dictionary containing API configuration details.
-              Returns None if the section is not found or required keys are missing.
+        APISettings: The API configuration; supports dict-style get() and [].
+                     Returns None if the section is not found or required keys are missing.
     """
     if api_type not in ['embedding_api', 'reranker_api']:
         raise ValueError("api_type must be either 'embedding_api' or 'reranker_api'")
     
-    config = configparser.ConfigParser()
-    config_path = get_config_path()
-    
-    if not os.path.exists(config_path):
-        print(f"Error: config.ini not found at {config_path}")
-        return None
-        
-    config.read(config_path)
+    return _call_cached(_get_api_config_cached, None, api_type)
+
+@functools.lru_cache(maxsize=8)
+def _get_api_config_cached(api_type: str, sig: Tuple[int, int, int]) -> Optional[APISettings]:
+    config = _require_config(sig)
     
     if api_type not in config:
         print(f"Error: Section [{api_type}] not found in config.ini.")
         return None
     
-    endpoint = config.get(api_type, 'endpoint', fallback=None)
-    api_key = config.get(api_type, 'api_key', fallback=None)
-    model = config.get(api_type, 'model', fallback=None)
-    timeout = config.getint(api_type, 'timeout', fallback=30)
+    section = config[api_type]
+    endpoint = _nn(section.get('endpoint'))
+    api_key = section.get('api_key')
+    model = _nn(section.get('model'))
+    timeout = _as_int(section.get('timeout'), 30)
     
-    if not endpoint or not endpoint.strip():
+    if not endpoint:
         print(f"Error: endpoint for [{api_type}] not set in config.ini.")
         return None
     
-    if not api_key or 'your_' in api_key.lower() or 'api_key_here' in api_key.lower():
+    if not api_key or _is_api_key_placeholder(api_key):
         print(f"Error: API key for [{api_type}] not set in config.ini.")
         return None
     
-    if not model or not model.strip():
+    if not model:
         print(f"Error: model for [{api_type}] not set in config.ini.")
         return None
     
-    return {
-        'endpoint': endpoint,
-        'api_key': api_key,
-        'model': model,
-        'timeout': timeout
-    }
+    return APISettings(
+        endpoint=endpoint,
+        api_key=api_key,
+        model=model,
+        timeout=timeout
+    )
 
 
-def get_embedding_api_config() -> Optional[Dict[str, Any]]:
+def get_embedding_api_config() -> Optional[APISettings]:
     """
     Reads the embedding API configuration from the config.ini file.
     
     Returns:
-        dict: A dictionary containing embedding API configuration details.
+        APISettings: The embedding API configuration details.
     """
     return get_api_config('embedding_api')
 
 
-def get_reranker_api_config() -> Optional[Dict[str, Any]]:
+def get_reranker_api_config() -> Optional[APISettings]:
     """
     Reads the reranker API configuration from the config.ini file.
     
     Returns:
-        dict: A dictionary containing reranker API configuration details.
+        APISettings: The reranker API configuration details.
     """
     return get_api_config('reranker_api')
 
 
-def get_backend_config() -> Dict[str, Any]:
+def get_backend_config() -> BackendSettings:
     """
     Reads the backend configuration from the config.ini file.
     
     Returns:
-        dict: A dictionary containing backend configuration details.
+        BackendSettings: The backend configuration; supports dict-style get() and [].
     """
-    config = configparser.ConfigParser()
-    config_path = get_config_path()
-    
-    if not os.path.exists(config_path):
-        print(f"Error: config.ini not found at {config_path}")
-        return {
-            'base_url': 'http://localhost:8000',
-            'enable_history': False,
-            'user_id': ''
-        }
-        
-    if not safe_read_config(config, config_path):
-        print(f"Error: Failed to read config.ini at {config_path}")
-        return {
-            'base_url': 'http://localhost:8000',
-            'enable_history': False,
-            'user_id': ''
-        }
+    return _call_cached(_get_backend_config_cached, _DEFAULT_BACKEND)
+
+@functools.lru_cache(maxsize=4)
+def _get_backend_config_cached(sig: Tuple[int, int, int]) -> BackendSettings:
+    config = _require_config(sig)
     
     if 'backend' not in config:
         print("Warning: [backend] section not found in config.ini. Using defaults.")
-        return {
-            'base_url': 'http://localhost:8000',
-            'enable_history': False,
-            'user_id': ''
-        }
+        return _DEFAULT_BACKEND
+    
+    section = config['backend']
+    defaults = _DEFAULT_BACKEND
+    return BackendSettings(
+        base_url=section.get('base_url', defaults.base_url),
+        enable_history=_as_bool(section.get('enable_history'), defaults.enable_history),
+        user_id=section.get('user_id', defaults.user_id)
+    )
+
+
+# 所有按文件签名缓存结果的 get_*_config 实现，保存配置后统一清空
+_CACHED_GETTERS = (
+    _get_app_config_cached,
+    _get_model_config_cached,
+    _get_knowledge_base_config_cached,
+    _get_chromadb_config_cached,
+    _get_api_config_cached,
+    _get_backend_config_cached,
+)
+
+
+def _format_ini_value(value: Any) -> str:
+    """将配置值转换为INI格式的字符串：布尔值小写，None写为空字符串"""
+    if value is None:
+        return ''
+    if isinstance(value, bool):
+        return str(value).lower()
+    return str(value)
+
+
+# 各配置节允许写入的键；保存时不在其中的键会被忽略
+SECTION_SCHEMAS: Dict[str, Tuple[str, ...]] = {
+    'app': ('screen_number',),
+    'vlm': ('api_key', 'model_name', 'base_url', 'proxy'),
+    'llm': ('llm_provider', 'api_key', 'google_api_key', 'model_name', 'base_url', 'proxy'),
+    'knowledge_base': ('enabled', 'storage_path', 'max_file_size_mb', 'chunk_size',
+                       'chunk_overlap', 'max_collections', 'background_processing',
+                       'max_concurrent_tasks'),
+    'chromadb': ('connection_type', 'host', 'port', 'path', 'auth_token', 'ssl_enabled'),
+    'embedding_api': ('endpoint', 'api_key', 'model', 'timeout', 'max_retries', 'retry_delay'),
+    'reranker_api': ('endpoint', 'api_key', 'model', 'timeout', 'max_retries', 'retry_delay'),
+    'backend': ('base_url', 'enable_history', 'user_id', 'api_token', 'upload_timeout'),
+}
+
+
+def _write_config_atomic(config_path: str, data: bytes, st: Optional[os.stat_result]):
+    """
+    先把完整内容写入同目录下唯一命名的临时文件并 fsync 落盘，再用 os.replace 原子替换 config.ini。
+    写入中途崩溃也不会留下半截或空的配置文件，并发保存也不会互相覆盖临时文件。
     
-    return {
-        'base_url': config.get('backend', 'base_url', fallback='http://localhost:8000'),
-        'enable_history': config.getboolean('backend', 'enable_history', fallback=False),
-        'user_id': config.get('backend', 'user_id', fallback='')
-    }
+    Args:
+        config_path: 配置文件路径
+        data: 要写入的完整内容
+        st: 原配置文件的状态，用于保留文件权限；文件不存在时为None
+    """
+    config_dir = os.path.dirname(os.path.abspath(config_path))
+    fd, tmp_path = tempfile.mkstemp(
+        prefix=os.path.basename(config_path) + '.', suffix='.tmp', dir=config_dir
+    )
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        # mkstemp 创建的文件权限为 0600，替换前恢复原文件（或默认）的权限
+        os.chmod(tmp_path, (st.st_mode & 0o777) if st is not None else 0o644)
+        os.replace(tmp_path, config_path)
+    except OSError:
+        # 写入或替换失败时清理临时文件，原配置文件保持不变
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
 
 
-def save_backend_config(config_data: Dict[str, Any]):
+def save_sections(updates: Dict[str, Dict[str, Any]]):
     """
-    Saves backend configuration to the config.ini file.
+    Saves several config.ini sections with a single read and a single write.
+    Only the keys listed in SECTION_SCHEMAS for each section are written.
     
     Args:
-        config_data (dict): A dictionary containing backend configuration details.
-    """
-    config = configparser.ConfigParser()
-    config_path = get_config_path()
+        updates (dict): Maps section names to the key/value pairs to set in them.
+        
+    Raises:
+        ValueError: If a section is not listed in SECTION_SCHEMAS.
+        _ConfigReadError: If config.ini exists but cannot be read; the file is left untouched.
+    """
+    for section in updates:
+        if section not in SECTION_SCHEMAS:
+            raise ValueError(f"Unknown config section: [{section}]")
+    
+    config_path = _CONFIG_PATH
+    
+    # 缓存中的解析结果即为文件当前内容，直接由它构建写入用的 ConfigParser，无需再读一遍
+    st = _stat_config()
+    sections = _load_cached_config(_config_sig(st)) if st is not None else None
+    if st is not None and sections is None:
+        # 文件存在但读取失败：若继续保存，其余配置节会全部丢失，因此不写入
+        raise _ConfigReadError(f"Failed to read config.ini at {config_path}; not saving")
+    
+    # 写入仍使用 configparser；configparser 只在保存时才导入
+    if sections is not None:
+        config = sections.to_parser()
+    else:
+        import configparser
+        config = configparser.ConfigParser(interpolation=None)
+    
+    for section, values in updates.items():
+        if section not in config:
+            config.add_section(section)
+        schema = SECTION_SCHEMAS[section]
+        for key, value in values.items():
+            if key not in schema:
+                print(f"Warning: Ignoring unknown key '{key}' for section [{section}].")
+                continue
+            config.set(section, key, _format_ini_value(value))
+    
+    # config.write 会产生大量小的写调用，先写入内存再一次性写入文件
+    buffer = io.StringIO()
+    config.write(buffer)
+    text = buffer.getvalue()
     
-    if os.path.exists(config_path):
-        safe_read_config(config, config_path)
+    # Write to file with UTF-8 encoding
+    _write_config_atomic(config_path, text.encode('utf-8'), st)
     
-    if 'backend' not in config:
-        config.add_section('backend')
+    # 内存中的内容与新文件一致，记录新的文件签名即可继续使用
+    with _config_lock:
+        _config_cache['sections'] = _LazyConfig(text)
+        _config_cache['sig'] = _config_sig(os.stat(config_path))
     
-    # Update backend settings
-    for key, value in config_data.items():
-        if isinstance(value, bool):
-            config.set('backend', key, str(value).lower())
-        else:
-            config.set('backend', key, str(value))
+    # 文件系统时间精度较粗时，保存前后的修改时间可能相同，需显式清空结果缓存
+    for cached_fn in _CACHED_GETTERS:
+        cached_fn.cache_clear()
+
+
+def save_section(section: str, config_data: Dict[str, Any]):
+    """
+    Saves one config.ini section.
     
-    # Write to file with UTF-8 encoding
-    with open(config_path, 'w', encoding='utf-8') as configfile:
-        config.write(configfile)
+    Args:
+        section (str): The section name; must be listed in SECTION_SCHEMAS.
+        config_data (dict): The key/value pairs to set in the section.
+    """
+    save_sections({section: config_data})
+
+
+def save_backend_config(config_data: Dict[str, Any]):
+    """
+    Saves backend configuration to the config.ini file.
+    
+    Args:
+        config_data (dict): A dictionary containing backend configuration details.
+    """
+    save_section('backend', config_data)
 
 
 def save_knowledge_base_config(config_data: Dict[str, Any]):
@@ -416,43 +834,9 @@ def save_knowledge_base_config(config_data: Dict[str, Any]):
     Args:
         config_data (dict): A dictionary containing knowledge base configuration details.
     """
-    print("📄 [配置管理器] 开始保存知识库配置到 config.ini")
-    print(f"📝 [配置管理器] 接收到的配置数据: {config_data}")
-    
-    config = configparser.ConfigParser()
-    config_path = get_config_path()
-    print(f"📂 [配置管理器] 配置文件路径: {config_path}")
-    
-    if os.path.exists(config_path):
-        print("📖 [配置管理器] 读取现有配置文件...")
-        config.read(config_path)
-    else:
-        print("🆕 [配置管理器] 配置文件不存在，将创建新文件")
-    
-    if 'knowledge_base' not in config:
-        print("➕ [配置管理器] 添加 [knowledge_base] 配置节")
-        config.add_section('knowledge_base')
-    else:
-        print("✅ [配置管理器] [knowledge_base] 配置节已存在")
-    
-    # Update knowledge base settings
-    print("🔄 [配置管理器] 更新知识库设置...")
-    for key, value in config_data.items():
-        # Convert boolean values to lowercase strings for INI format
-        if isinstance(value, bool):
-            str_value = str(value).lower()
-            print(f"   - {key}: {value} -> {str_value} (布尔值转换)")
-            config.set('knowledge_base', key, str_value)
-        else:
-            print(f"   - {key}: {value}")
-            config.set('knowledge_base', key, str(value))
-    
-    # Write to file
-    print("💾 [配置管理器] 写入配置文件...")
-    with open(config_path, 'w') as configfile:
-        config.write(configfile)
-    
-    print("✅ [配置管理器] 知识库配置保存完成")
+    logger.debug("[配置管理器] 保存知识库配置到 %s: %s", _CONFIG_PATH, config_data)
+    save_section('knowledge_base', config_data)
+    logger.debug("[配置管理器] 知识库配置保存完成")
 
 
 def save_chromadb_config(config_data: Dict[str, Any]):
@@ -462,25 +846,7 @@ def save_chromadb_config(config_data: Dict[str, Any]):
     Args:
         config_data (dict): A dictionary containing ChromaDB configuration details.
     """
-    config = configparser.ConfigParser()
-    config_path = get_config_path()
-    
-    if os.path.exists(config_path):
-        config.read(config_path)
-    
-    if 'chromadb' not in config:
-        config.add_section('chromadb')
-    
-    # Update ChromaDB settings
-    for key, value in config_data.items():
-        if value is not None:
-            config.set('chromadb', key, str(value))
-        else:
-            config.set('chromadb', key, '')
-    
-    # Write to file
-    with open(config_path, 'w') as configfile:
-        config.write(configfile)
+    save_section('chromadb', config_data)
 
 
 def save_embedding_api_config(config_data: Dict[str, Any]):
@@ -514,25 +880,24 @@ def save_api_config(api_type: str, config_data: Dict[str, Any]):
     if api_type not in ['embedding_api', 'reranker_api']:
         raise ValueError("api_type must be either 'embedding_api' or 'reranker_api'")
     
-    config = configparser.ConfigParser()
-    config_path = get_config_path()
-    
-    if os.path.exists(config_path):
-        config.read(config_path)
-    
-    if api_type not in config:
-        config.add_section(api_type)
-    
-    # Update API settings
-    for key, value in config_data.items():
-        if value is not None:
-            config.set(api_type, key, str(value))
-        else:
-            config.set(api_type, key, '')
+    save_section(api_type, config_data)
+
+
+# 最近一次校验通过时 config.ini 的文件签名及其要求的目录；
+# 文件未变且这些目录仍然存在时直接返回True
+_validated_sig = None
+_validated_dirs: Tuple[str, ...] = ()
+
+def _ensure_dir(path: str):
+    """
+    确保目录存在。每次都检查 os.path.isdir（开销很小），目录存在时跳过 os.makedirs；
+    目录在校验后被删除时会重新创建。
     
-    # Write to file
-    with open(config_path, 'w') as configfile:
-        config.write(configfile)
+    Raises:
+        OSError: 目录创建失败
+    """
+    if not os.path.isdir(path):
+        os.makedirs(path, exist_ok=True)
 
 
 def validate_knowledge_base_config() -> bool:
@@ -542,21 +907,31 @@ def validate_knowledge_base_config() -> bool:
     Returns:
         bool: True if configuration is valid, False otherwise.
     """
+    global _validated_sig, _validated_dirs
+    st = _stat_config()
+    if (st is not None and _config_sig(st) == _validated_sig
+            and all(os.path.isdir(path) for path in _validated_dirs)):
+        return True
+    
     kb_config = get_knowledge_base_config()
     if not kb_config:
         return False
     
     if not kb_config['enabled']:
+        _validated_sig = _config_sig(st) if st is not None else None
+        _validated_dirs = ()
         return True  # If disabled, no need to validate further
     
     # Check if storage path is accessible
     storage_path = kb_config['storage_path']
     try:
-        os.makedirs(storage_path, exist_ok=True)
+        _ensure_dir(storage_path)
     except Exception as e:
         print(f"Error: Cannot create storage path {storage_path}: {e}")
         return False
     
+    checked_dirs = [storage_path]
+    
     # Validate ChromaDB config
     chromadb_config = get_chromadb_config()
     if not chromadb_config:
@@ -566,9 +941,29 @@ def validate_knowledge_base_config() -> bool:
         # Check if local path is accessible
         db_path = chromadb_config['path']
         try:
-            os.makedirs(db_path, exist_ok=True)
+            _ensure_dir(db_path)
         except Exception as e:
             print(f"Error: Cannot create ChromaDB path {db_path}: {e}")
             return False
+        checked_dirs.append(db_path)
     
-    return True
\ No newline at end of file
+    _validated_sig = _config_sig(st) if st is not None else None
+    _validated_dirs = tuple(checked_dirs)
+    return True
+
+
+def prime_config_cache():
+    """
+    预先读取并解析 config.ini，使之后首次调用 get_*_config 时无需再读文件。
+    可在后台线程中调用（如应用启动时与窗口创建并行）；与前台调用同时进行时，
+    前台会等待同一次解析完成。读取失败时不做任何处理，由之后的 get_*_config 报告。
+    """
+    st = _stat_config()
+    if st is None:
+        return
+    config = _load_cached_config(_config_sig(st))
+    if config is not None:
+        try:
+            config.to_dict()
+        except _ConfigReadError:
+            pass
@@ -3,6 +3,7 @@
 """
 
 from fastapi import APIRouter, HTTPException, Depends
+from fastapi.concurrency import run_in_threadpool
 from pydantic import BaseModel
 from datetime import timedelta
 from auth import (
@@ -33,7 +34,8 @@ class UserInfo(BaseModel):
 @router.post("/login", response_model=LoginResponse)
 async def login(request: LoginRequest):
     """用户登录"""
-    user = authenticate_user(request.username, request.password)
+    # bcrypt 校验耗时较长，放到线程池中执行，避免阻塞事件循环
+    user = await run_in_threadpool(authenticate_user, request.username, request.password)
     
     if not user:
         raise HTTPException(
@@ -2,14 +2,15 @@
 ChromaDB 查询 API 端点
 """
 
+import asyncio
 from fastapi import APIRouter, HTTPException
-from typing import Optional, List
+from typing import Optional, List, Tuple
 import chromadb
-from chromadb.config import Settings
 from pydantic import BaseModel
 import configparser
 import os
-import requests
+import threading
+import httpx
 
 router = APIRouter(prefix="/api/chromadb", tags=["chromadb"])
 
@@ -27,9 +28,20 @@ class QueryResult(BaseModel):
     distance: float
 
 
-def get_config():
-    """读取配置文件"""
-    config = configparser.ConfigParser()
+# 已解析出的配置文件路径；找到后不再逐个尝试候选路径
+_RESOLVED_CONFIG_PATH: Optional[str] = None
+
+# 已读取配置的缓存，按文件修改时间失效
+_config_cache = {'path': None, 'mtime': None, 'config': None}
+
+
+def _resolve_config_path() -> Tuple[Optional[str], Optional[os.stat_result]]:
+    """
+    在候选路径中查找配置文件。
+    
+    Returns:
+        tuple: (第一个存在的绝对路径, 它的 os.stat 结果)；都不存在时为 (None, None)
+    """
     current_dir = os.path.dirname(os.path.abspath(__file__))
     
     # 尝试多个可能的配置文件路径
@@ -43,104 +55,220 @@ def get_config():
     
     for config_path in config_paths:
         abs_path = os.path.abspath(config_path)
-        if os.path.exists(abs_path):
-            try:
-                config.read(abs_path, encoding='utf-8')
-                print(f"✓ 成功加载配置文件: {abs_path}")
-                return config, abs_path
-            except Exception as e:
-                print(f"✗ 读取配置文件失败 {abs_path}: {e}")
-                continue
+        # 一次stat同时完成存在性检查并取得缓存校验所需的修改时间
+        try:
+            return abs_path, os.stat(abs_path)
+        except OSError:
+            continue
+    return None, None
+
+
+def _load_config():
+    """
+    读取配置文件。路径只解析一次，之后每次请求只需一次stat；
+    文件内容按修改时间缓存，未修改时直接返回已解析的配置（调用方不应修改它）。
+    """
+    global _RESOLVED_CONFIG_PATH
+    
+    abs_path, st = _RESOLVED_CONFIG_PATH, None
+    if abs_path is not None:
+        try:
+            st = os.stat(abs_path)
+        except FileNotFoundError:
+            # 文件已被移走，重新查找
+            abs_path = _RESOLVED_CONFIG_PATH = None
+    if abs_path is None:
+        abs_path, st = _resolve_config_path()
+        if abs_path is None:
+            print("✗ 未找到配置文件")
+            return configparser.ConfigParser(), None
+        _RESOLVED_CONFIG_PATH = abs_path
+    
+    mtime = st.st_mtime_ns
+    if _config_cache['path'] == abs_path and _config_cache['mtime'] == mtime:
+        return _config_cache['config'], abs_path
+    
+    config = configparser.ConfigParser()
+    try:
+        # 配置文件很小，一次性读入后用 read_string 解析，省去逐行的缓冲文本IO
+        with open(abs_path, 'rb') as f:
+            data = f.read()
+        try:
+            text = data.decode('utf-8')
+        except UnicodeDecodeError:
+            text = data.decode('gbk')
+        config.read_string(text, source=abs_path)
+    except Exception as e:
+        print(f"✗ 读取配置文件失败 {abs_path}: {e}")
+        return configparser.ConfigParser(), None
+    print(f"✓ 成功加载配置文件: {abs_path}")
+    _config_cache.update(path=abs_path, mtime=mtime, config=config)
+    return config, abs_path
+
+
+class CustomEmbeddingFunction:
+    """
+    调用 OpenAI 兼容的 embedding 接口生成向量。
+    ChromaDB 的 embedding 函数约定是同步调用，由复用连接的 httpx.Client 实现；
+    异步接口中使用 embed_async，通过 httpx.AsyncClient 请求，不阻塞事件循环。
+    """
+    
+    def __init__(self, endpoint, api_key, model):
+        self.endpoint = endpoint
+        self.api_key = api_key
+        self.model = model
+        self._headers = {
+            'Authorization': f'Bearer {self.api_key}',
+            'Content-Type': 'application/json'
+        }
+        # 复用 TCP/TLS 连接，避免每次查询都重新握手
+        self._client = httpx.Client(headers=self._headers, timeout=30)
+        self._async_client = None
+    
+    def _build_payload(self, input):
+        # 确保 input 是列表
+        if isinstance(input, str):
+            texts = [input]
+        else:
+            texts = input
+        
+        return {
+            'model': self.model,
+            'input': texts,
+            'encoding_format': 'float'
+        }
+    
+    @staticmethod
+    def _parse_embeddings(response):
+        response.raise_for_status()
+        data = response.json()
+        
+        # 提取 embeddings
+        return [item['embedding'] for item in data['data']]
+    
+    def __call__(self, input):
+        """生成 embeddings"""
+        try:
+            response = self._client.post(self.endpoint, json=self._build_payload(input))
+            return self._parse_embeddings(response)
+        except Exception as e:
+            raise Exception(f"Embedding API 调用失败: {str(e)}")
+    
+    async def embed_async(self, input):
+        """异步生成 embeddings"""
+        if self._async_client is None:
+            self._async_client = httpx.AsyncClient(headers=self._headers, timeout=30)
+        try:
+            response = await self._async_client.post(self.endpoint, json=self._build_payload(input))
+            return self._parse_embeddings(response)
+        except Exception as e:
+            raise Exception(f"Embedding API 调用失败: {str(e)}")
     
-    print("✗ 未找到配置文件")
-    return config, None
+    def close(self):
+        """关闭同步客户端的连接池"""
+        self._client.close()
+    
+    async def aclose(self):
+        """关闭同步和异步客户端的连接池"""
+        self.close()
+        if self._async_client is not None:
+            await self._async_client.aclose()
+            self._async_client = None
+
+
+# 被替换的 embedding 函数的关闭任务，保留引用直到任务完成
+_CLOSING_TASKS = set()
+
+
+def _close_embedding_function(embedding_function):
+    """关闭被替换的 embedding 函数；在事件循环中调用时异步关闭其异步客户端"""
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        embedding_function.close()
+        return
+    task = loop.create_task(embedding_function.aclose())
+    _CLOSING_TASKS.add(task)
+    task.add_done_callback(_CLOSING_TASKS.discard)
+
+
+# 跨请求复用的 embedding 函数和 ChromaDB 客户端，配置项变化时才重新创建
+_EMBED_FN = None
+_EMBED_FN_SIG = None
+_CLIENT = None
+_CLIENT_SIG = None
+# get_chromadb_client 在线程池中调用，加锁避免并发请求重复创建客户端
+_CLIENT_LOCK = threading.Lock()
 
 
 def get_embedding_function():
     """根据配置文件获取 embedding 函数"""
-    config, config_path = get_config()
+    global _EMBED_FN, _EMBED_FN_SIG
+    config, config_path = _load_config()
     
     if not config_path:
+        return None
     
     if 'embedding_api' not in config:
         return None
     
-    endpoint = config.get('embedding_api', 'endpoint', fallback=None)
-    api_key = config.get('embedding_api', 'api_key', fallback=None)
-    model = config.get('embedding_api', 'model', fallback=None)
+    # 先取出 section 代理，再逐项读取，避免每个键都重复查找 section
+    section = config['embedding_api']
+    endpoint = section.get('endpoint')
+    api_key = section.get('api_key')
+    model = section.get('model')
     
     if not all([endpoint, api_key, model]):
         return None
     
-    # 创建自定义 embedding 函数
-    class CustomEmbeddingFunction:
-        def __init__(self, endpoint, api_key, model):
-            self.endpoint = endpoint
-            self.api_key = api_key
-            self.model = model
-        
-        def __call__(self, input):
-            """生成 embeddings"""
-            headers = {
-                'Authorization': f'Bearer {self.api_key}',
-                'Content-Type': 'application/json'
-            }
-            
-            # 确保 input 是列表
-            if isinstance(input, str):
-                texts = [input]
-            else:
-                texts = input
-            
-            payload = {
-                'model': self.model,
-                'input': texts,
-                'encoding_format': 'float'
-            }
-            
-            try:
-                response = requests.post(self.endpoint, headers=headers, json=payload, timeout=30)
-                response.raise_for_status()
-                data = response.json()
-                
-                # 提取 embeddings
-                embeddings = [item['embedding'] for item in data['data']]
-                return embeddings
-            except Exception as e:
-                raise Exception(f"Embedding API 调用失败: {str(e)}")
-    
-    return CustomEmbeddingFunction(endpoint, api_key, model)
+    sig = (endpoint, api_key, model)
+    if _EMBED_FN is None or _EMBED_FN_SIG != sig:
+        if _EMBED_FN is not None:
+            _close_embedding_function(_EMBED_FN)
+        _EMBED_FN = CustomEmbeddingFunction(endpoint, api_key, model)
+        _EMBED_FN_SIG = sig
+    return _EMBED_FN
 
 
 def get_chromadb_client():
-    """根据配置文件获取 ChromaDB 客户端"""
-    config, config_path = get_config()
+    """
+    根据配置文件获取 ChromaDB 客户端（配置未变化时复用已创建的客户端）。
+    创建客户端会进行网络连接，异步接口中应通过 asyncio.to_thread 调用。
+    """
+    with _CLIENT_LOCK:
+        return _get_chromadb_client_locked()
+
+
+def _get_chromadb_client_locked():
+    global _CLIENT, _CLIENT_SIG
+    config, config_path = _load_config()
     
     if not config_path or 'chromadb' not in config:
         # 默认使用本地连接
-        print("未找到配置文件或配置不完整，使用默认本地连接")
-        return chromadb.PersistentClient(path="./data/chromadb")
+        sig = ('local', './data/chromadb')
+        if _CLIENT is None or _CLIENT_SIG != sig:
+            print("未找到配置文件或配置不完整，使用默认本地连接")
+            _CLIENT = chromadb.PersistentClient(path="./data/chromadb")
+            _CLIENT_SIG = sig
+        return _CLIENT
     
-    connection_type = config.get('chromadb', 'connection_type', fallback='local')
+    section = config['chromadb']
+    connection_type = section.get('connection_type', 'local')
     
     if connection_type == 'remote':
-        host = config.get('chromadb', 'host', fallback='localhost')
-        port = config.getint('chromadb', 'port', fallback=8000)
-        ssl_enabled = config.getboolean('chromadb', 'ssl_enabled', fallback=False)
-        auth_token = config.get('chromadb', 'auth_token', fallback=None)
+        host = section.get('host', 'localhost')
+        port = section.getint('port', 8000)
+        ssl_enabled = section.getboolean('ssl_enabled', False)
+        auth_token = section.get('auth_token')
+        
+        sig = ('remote', host, port, ssl_enabled, auth_token)
+        if _CLIENT is not None and _CLIENT_SIG == sig:
+            return _CLIENT
         
         # 构建远程连接URL
         protocol = 'https' if ssl_enabled else 'http'
         url = f"{protocol}://{host}:{port}"
         
-        # 创建远程客户端
-        settings = Settings(
-            chroma_api_impl="chromadb.api.fastapi.FastAPI",
-            chroma_server_host=host,
-            chroma_server_http_port=port,
-            chroma_server_ssl_enabled=ssl_enabled,
-        )
-        
         # 如果有认证令牌，添加到headers
         headers = {}
         if auth_token:
@@ -154,38 +282,45 @@ def get_chromadb_client():
                 ssl=ssl_enabled,
                 headers=headers
             )
-            return client
         except Exception as e:
             raise Exception(f"无法连接到远程 ChromaDB 服务器 {url}: {str(e)}")
+        _CLIENT, _CLIENT_SIG = client, sig
+        return client
     else:
         # 本地连接
-        path = config.get('chromadb', 'path', fallback='./data/chromadb')
-        return chromadb.PersistentClient(path=path)
+        path = section.get('path', './data/chromadb')
+        sig = ('local', path)
+        if _CLIENT is None or _CLIENT_SIG != sig:
+            _CLIENT = chromadb.PersistentClient(path=path)
+            _CLIENT_SIG = sig
+        return _CLIENT
 
 
 @router.get("/config")
 async def get_config_info():
     """获取 ChromaDB 配置信息（用于调试）"""
-    config, found_path = get_config()
+    config, found_path = _load_config()
     
     result = {
         "config_file": found_path or "未找到",
         "working_directory": os.getcwd()
     }
     if found_path and config.has_section('chromadb'):
+        section = config['chromadb']
         result.update({
             "chromadb": {
-                "connection_type": config.get('chromadb', 'connection_type', fallback='local'),
-                "host": config.get('chromadb', 'host', fallback='N/A'),
-                "port": config.get('chromadb', 'port', fallback='N/A'),
-                "ssl_enabled": config.get('chromadb', 'ssl_enabled', fallback='N/A'),
-                "path": config.get('chromadb', 'path', fallback='N/A')
+                "connection_type": section.get('connection_type', 'local'),
+                "host": section.get('host', 'N/A'),
+                "port": section.get('port', 'N/A'),
+                "ssl_enabled": section.get('ssl_enabled', 'N/A'),
+                "path": section.get('path', 'N/A')
             }
         })
     if found_path and config.has_section('embedding_api'):
+        section = config['embedding_api']
         result["embedding_api"] = {
-            "endpoint": config.get('embedding_api', 'endpoint', fallback='N/A'),
-            "model": config.get('embedding_api', 'model', fallback='N/A'),
+            "endpoint": section.get('endpoint', 'N/A'),
+            "model": section.get('model', 'N/A'),
             "configured": True
         }
     else:
@@ -198,19 +333,29 @@ async def get_config_info():
 
 
 @router.get("/collections")
-async def get_collections():
-    """获取所有集合列表"""
+async def get_collections(with_counts: bool = False):
+    """
+    获取所有集合列表
+    
+    with_counts 为 True 时附带每个集合的文档数；远程 ChromaDB 上每次 count 都是一次
+    网络往返，因此在线程中并发执行，而不是逐个串行等待。
+    """
     try:
-        client = get_chromadb_client()
-        collections = client.list_collections()
+        # 创建客户端和列出集合都是同步的网络调用，放到线程中执行
+        client = await asyncio.to_thread(get_chromadb_client)
+        collections = await asyncio.to_thread(client.list_collections)
         
-        collection_info = []
-        for col in collections:
-            collection_info.append({
-                "name": col.name,
-                "count": col.count(),
-                "metadata": col.metadata
-            })
+        collection_info = [
+            {"name": col.name, "metadata": col.metadata}
+            for col in collections
+        ]
+        
+        if with_counts:
+            counts = await asyncio.gather(
+                *(asyncio.to_thread(col.count) for col in collections)
+            )
+            for info, count in zip(collection_info, counts):
+                info["count"] = count
         
         return {"collections": collection_info}
     except Exception as e:
@@ -221,40 +366,58 @@ async def get_collections():
 async def query_collection(request: QueryRequest):
     """查询集合"""
     try:
-        client = get_chromadb_client()
+        client = await asyncio.to_thread(get_chromadb_client)
         embedding_function = get_embedding_function()
         
         # 获取集合
         try:
             if embedding_function:
-                collection = client.get_collection(
+                collection = await asyncio.to_thread(
+                    client.get_collection,
                     name=request.collection_name,
                     embedding_function=embedding_function
                 )
             else:
-                collection = client.get_collection(name=request.collection_name)
+                collection = await asyncio.to_thread(client.get_collection, name=request.collection_name)
         except Exception as e:
             raise HTTPException(status_code=404, detail=f"集合 '{request.collection_name}' 不存在: {str(e)}")
         
-        # 执行查询
+        # 执行查询：embedding 请求异步发出，ChromaDB 的同步查询放到线程中执行，都不阻塞事件循环
         try:
-            results = collection.query(
-                query_texts=[request.query_text],
-                n_results=request.n_results
-            )
+            if embedding_function:
+                query_embeddings = await embedding_function.embed_async([request.query_text])
+                results = await asyncio.to_thread(
+                    collection.query,
+                    query_embeddings=query_embeddings,
+                    n_results=request.n_results
+                )
+            else:
+                results = await asyncio.to_thread(
+                    collection.query,
+                    query_texts=[request.query_text],
+                    n_results=request.n_results
+                )
         except Exception as e:
             raise HTTPException(status_code=500, detail=f"查询失败: {str(e)}")
         
         # 格式化结果
         formatted_results = []
         if results['ids'] and len(results['ids']) > 0:
-            for i in range(len(results['ids'][0])):
-                formatted_results.append({
-                    "id": results['ids'][0][i],
-                    "document": results['documents'][0][i] if results['documents'] else "",
-                    "metadata": results['metadatas'][0][i] if results['metadatas'] else {},
-                    "distance": results['distances'][0][i] if results['distances'] else 0.0
-                })
+            # 按列取出后 zip 成逐条记录，缺失的列用默认值补齐
+            ids = results['ids'][0]
+            count = len(ids)
+            documents = results['documents'][0] if results['documents'] else [""] * count
+            metadatas = results['metadatas'][0] if results['metadatas'] else [{}] * count
+            distances = results['distances'][0] if results['distances'] else [0.0] * count
+            formatted_results = [
+                {
+                    "id": doc_id,
+                    "document": document,
+                    "metadata": metadata,
+                    "distance": distance
+                }
+                for doc_id, document, metadata, distance in zip(ids, documents, metadatas, distances)
+            ]
         
         return {
             "collection": request.collection_name,
@@ -272,29 +435,39 @@ async def query_collection(request: QueryRequest):
 async def get_collection_sample(collection_name: str, limit: int = 5):
     """获取集合的示例数据"""
     try:
-        client = get_chromadb_client()
+        client = await asyncio.to_thread(get_chromadb_client)
         
+        # ChromaDB 客户端的调用都是同步的，放到线程中执行，不阻塞事件循环
         try:
-            collection = client.get_collection(name=collection_name)
+            collection = await asyncio.to_thread(client.get_collection, name=collection_name)
         except Exception:
             raise HTTPException(status_code=404, detail=f"集合 '{collection_name}' 不存在")
         
-        # 获取前N条数据
-        results = collection.get(limit=limit)
+        # 获取前N条数据和总数
+        results, total_count = await asyncio.gather(
+            asyncio.to_thread(collection.get, limit=limit),
+            asyncio.to_thread(collection.count)
+        )
         
         samples = []
         if results['ids']:
-            for i in range(len(results['ids'])):
-                samples.append({
-                    "id": results['ids'][i],
-                    "document": results['documents'][i] if results['documents'] else "",
-                    "metadata": results['metadatas'][i] if results['metadatas'] else {}
-                })
+            ids = results['ids']
+            count = len(ids)
+            documents = results['documents'] if results['documents'] else [""] * count
+            metadatas = results['metadatas'] if results['metadatas'] else [{}] * count
+            samples = [
+                {
+                    "id": doc_id,
+                    "document": document,
+                    "metadata": metadata
+                }
+                for doc_id, document, metadata in zip(ids, documents, metadatas)
+            ]
         
         return {
             "collection": collection_name,
             "samples": samples,
-            "total_count": collection.count()
+            "total_count": total_count
         }
     except HTTPException:
         raise
@@ -2,17 +2,19 @@
 测验记录 API 端点
 """
 
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, UploadFile, File, Form
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import or_, desc, select, func
+from sqlalchemy import or_, desc, select, func, tuple_
 from typing import Optional
 from datetime import datetime
+import asyncio
+import base64
 import os
-import aiofiles
 
-from database import get_async_db
+from database import get_async_db, AsyncSessionLocal
 from models import QuizRecord
 from schemas import QuizRecordCreate, QuizRecordResponse, QuizRecordList
+from api.endpoints.stats import invalidate_stats_cache
 from typing import List
 
 # 公开路由（不需要认证，给客户端使用）
@@ -24,9 +26,49 @@ protected_router = APIRouter(prefix="/api/quiz", tags=["quiz-protected"])
 # 保留旧的router以兼容（已废弃）
 router = protected_router
 
+# 上传图片的复制缓冲区大小和大小上限
+UPLOAD_BUFFER_SIZE = 1 << 20
+MAX_IMAGE_SIZE = 20 * 1024 * 1024
+
+
+def _save_upload(src, file_path: str) -> int:
+    """把上传文件分块复制到磁盘，超过大小上限时停止，返回读取的字节数；复制失败时删除残留的半截文件"""
+    written = 0
+    try:
+        with open(file_path, 'wb', buffering=UPLOAD_BUFFER_SIZE) as dst:
+            while chunk := src.read(UPLOAD_BUFFER_SIZE):
+                written += len(chunk)
+                if written > MAX_IMAGE_SIZE:
+                    break
+                dst.write(chunk)
+    except Exception:
+        try:
+            os.remove(file_path)
+        except OSError:
+            pass
+        raise
+    return written
+
+
+def _encode_cursor(record: QuizRecord) -> str:
+    """把最后一条记录的 (timestamp, id) 编码为不透明的分页游标"""
+    raw = f"{record.timestamp.isoformat()}|{record.id}"
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii")
+
+
+def _decode_cursor(cursor: str):
+    """解析分页游标，返回 (timestamp, id)"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor.encode("ascii")).decode("utf-8")
+        ts, record_id = raw.rsplit("|", 1)
+        return datetime.fromisoformat(ts), int(record_id)
+    except (ValueError, UnicodeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
 
 @public_router.post("/record-with-image", response_model=QuizRecordResponse)
 async def create_quiz_record_with_image(
+    background_tasks: BackgroundTasks,
     question_text: str = Form(...),
     answer_text: str = Form(...),
     vlm_model: str = Form(...),
@@ -45,9 +87,13 @@ async def create_quiz_record_with_image(
         filename = f"{timestamp}_{image.filename}"
         file_path = os.path.join("uploads/images", filename)
         
-        async with aiofiles.open(file_path, 'wb') as f:
-            content = await image.read()
-            await f.write(content)
+        # 整个复制过程放到线程池中同步完成，只切换一次线程
+        written = await asyncio.get_running_loop().run_in_executor(
+            None, _save_upload, image.file, file_path
+        )
+        if written > MAX_IMAGE_SIZE:
+            os.remove(file_path)
+            raise HTTPException(status_code=413, detail="Image too large")
         
         # 创建记录
         record = QuizRecord(
@@ -63,14 +109,15 @@ async def create_quiz_record_with_image(
             session_id=session_id
         )
         
+        # 提交时的 flush 会填充 id 和默认时间戳，会话设置了 expire_on_commit=False，无需再 refresh 查询一次
         db.add(record)
         await db.commit()
-        await db.refresh(record)
+        invalidate_stats_cache()
         
-        # 广播新记录给所有WebSocket连接
+        # 响应返回后再广播新记录给所有WebSocket连接
         try:
             from api.endpoints.websocket import manager
-            await manager.broadcast({
+            background_tasks.add_task(manager.broadcast, {
                 "type": "new_record",
                 "data": record.to_dict()
             })
@@ -78,6 +125,8 @@ async def create_quiz_record_with_image(
             print(f"WebSocket广播失败: {e}")
         
         return record
+    except HTTPException:
+        raise
     except Exception as e:
         await db.rollback()
         raise HTTPException(status_code=500, detail=str(e))
@@ -101,9 +150,17 @@ async def get_quiz_records(
     limit: int = 20,
     user_id: Optional[str] = None,
     search: Optional[str] = None,
+    cursor: Optional[str] = None,
     db: AsyncSession = Depends(get_async_db)
 ):
-    """获取测验记录列表"""
+    """
+    获取测验记录列表
+    
+    传入上一页返回的 cursor 时按 (timestamp, id) 游标翻页，不需要扫描并丢弃前面的行，
+    也不再统计总数（total、page、pages 均为 None）；未传 cursor 时仍按 skip 偏移分页，
+    兼容旧的调用方式。
+    """
+    cursor_key = _decode_cursor(cursor) if cursor else None
     try:
         # 构建查询
         query = select(QuizRecord)
@@ -121,25 +178,45 @@ async def get_quiz_records(
                 )
             )
         
-        # 获取总数
-        count_query = select(func.count()).select_from(query.subquery())
-        total_result = await db.execute(count_query)
-        total = total_result.scalar()
-        
         # 分页查询
-        paginated_query = query.order_by(desc(QuizRecord.timestamp)).offset(skip).limit(limit)
-        result = await db.execute(paginated_query)
+        paginated_query = query.order_by(desc(QuizRecord.timestamp), desc(QuizRecord.id))
+        if cursor_key:
+            paginated_query = paginated_query.where(
+                tuple_(QuizRecord.timestamp, QuizRecord.id) < tuple_(*cursor_key)
+            )
+        else:
+            paginated_query = paginated_query.offset(skip)
+        
+        total = pages = page = None
+        if cursor_key:
+            # 游标翻页不需要总数，省掉一次全表计数
+            result = await db.execute(paginated_query.limit(limit))
+        else:
+            # 总数和分页查询都是只读的，总数在独立会话（独立连接）里与分页查询并发执行
+            count_query = select(func.count()).select_from(query.subquery())
+            async with AsyncSessionLocal() as count_db:
+                total_result, result = await asyncio.gather(
+                    count_db.execute(count_query),
+                    db.execute(paginated_query.limit(limit))
+                )
+            total = total_result.scalar()
+            
+            # 计算页数
+            pages = (total + limit - 1) // limit
+            page = (skip // limit) + 1
         records = result.scalars().all()
         
-        # 计算页数
-        pages = (total + limit - 1) // limit
-        page = (skip // limit) + 1
+        # 本页已满时返回下一页的游标
+        next_cursor = None
+        if records and len(records) == limit and records[-1].timestamp:
+            next_cursor = _encode_cursor(records[-1])
         
         return QuizRecordList(
             records=records,
             total=total,
             page=page,
-            pages=pages
+            pages=pages,
+            next_cursor=next_cursor
         )
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -214,5 +291,6 @@ async def delete_quiz_record(
     
     await db.delete(record)
     await db.commit()
+    invalidate_stats_cache()
     
     return {"message": "Record deleted successfully"}
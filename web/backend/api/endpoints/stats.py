@@ -4,63 +4,82 @@
 
 from fastapi import APIRouter, Depends
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import func, select
+from sqlalchemy import and_, case, func, select
 from datetime import datetime, timedelta
+import asyncio
+import time
 
-from database import get_async_db
+from database import get_async_db, AsyncSessionLocal
 from models import QuizRecord
 from schemas import StatsResponse
 
 router = APIRouter(prefix="/api/stats", tags=["stats"])
 
+# 统计结果缓存：记录未变化（版本号和最大 ID 都相同）且未超过 TTL 时直接复用
+STATS_CACHE_TTL = 10  # 秒
+_stats_cache = {'version': 0, 'key': None, 'computed_at': 0.0, 'response': None}
+
+
+def invalidate_stats_cache():
+    """记录新增或删除后调用，使下一次统计请求重新计算"""
+    _stats_cache['version'] += 1
+
 
 @router.get("", response_model=StatsResponse)
 async def get_stats(db: AsyncSession = Depends(get_async_db)):
     """获取统计信息"""
-    # 总数
-    total_query = select(func.count(QuizRecord.id))
-    total_result = await db.execute(total_query)
-    total = total_result.scalar()
+    # 先用一次主键索引查询判断数据是否变化
+    max_id_result = await db.execute(select(func.max(QuizRecord.id)))
+    key = (_stats_cache['version'], max_id_result.scalar())
+    now = time.monotonic()
+    if (_stats_cache['response'] is not None
+            and _stats_cache['key'] == key
+            and now - _stats_cache['computed_at'] < STATS_CACHE_TTL):
+        return _stats_cache['response']
     
-    # 平均处理时间
-    avg_query = select(func.avg(QuizRecord.total_time))
-    avg_result = await db.execute(avg_query)
-    avg_time = avg_result.scalar() or 0.0
+    response = await _compute_stats(db)
+    _stats_cache.update(key=key, computed_at=now, response=response)
+    return response
+
+
+async def _compute_stats(db: AsyncSession) -> StatsResponse:
+    """执行各项聚合查询"""
+    now = datetime.now()
+    # 今日范围用时间戳区间表示，可以直接使用 timestamp 索引，不必逐行计算 date()
+    today_start = datetime.combine(now.date(), datetime.min.time())
+    tomorrow_start = today_start + timedelta(days=1)
+    week_ago = now - timedelta(days=7)
+    
+    # 总数、平均处理时间、今日数量、本周数量用条件聚合合并为一条查询
+    summary_query = select(
+        func.count(QuizRecord.id),
+        func.avg(QuizRecord.total_time),
+        func.sum(case((and_(QuizRecord.timestamp >= today_start, QuizRecord.timestamp < tomorrow_start), 1), else_=0)),
+        func.sum(case((QuizRecord.timestamp >= week_ago, 1), else_=0))
+    )
     
     # 最常用的模型
     vlm_query = select(QuizRecord.vlm_model, func.count(QuizRecord.vlm_model)).group_by(QuizRecord.vlm_model)
-    vlm_result = await db.execute(vlm_query)
-    vlm_counts = vlm_result.all()
-    
     llm_query = select(QuizRecord.llm_model, func.count(QuizRecord.llm_model)).group_by(QuizRecord.llm_model)
-    llm_result = await db.execute(llm_query)
-    llm_counts = llm_result.all()
     
+    # 三条只读查询分别使用独立会话并发执行
+    async with AsyncSessionLocal() as vlm_db, AsyncSessionLocal() as llm_db:
+        summary_result, vlm_result, llm_result = await asyncio.gather(
+            db.execute(summary_query),
+            vlm_db.execute(vlm_query),
+            llm_db.execute(llm_query)
+        )
+    
+    total, avg_time, today_count, week_count = summary_result.one()
     most_used_models = {
-        "vlm": dict(vlm_counts),
-        "llm": dict(llm_counts)
+        "vlm": dict(vlm_result.all()),
+        "llm": dict(llm_result.all())
     }
     
-    # 今日数量
-    today = datetime.now().date()
-    today_query = select(func.count(QuizRecord.id)).where(
-        func.date(QuizRecord.timestamp) == today
-    )
-    today_result = await db.execute(today_query)
-    today_count = today_result.scalar()
-    
-    # 本周数量
-    week_ago = datetime.now() - timedelta(days=7)
-    week_query = select(func.count(QuizRecord.id)).where(
-        QuizRecord.timestamp >= week_ago
-    )
-    week_result = await db.execute(week_query)
-    week_count = week_result.scalar()
-    
     return StatsResponse(
         total_quizzes=total,
-        avg_processing_time=avg_time,
+        avg_processing_time=avg_time or 0.0,
         most_used_models=most_used_models,
-        today_count=today_count,
-        this_week_count=week_count
+        today_count=today_count or 0,
+        this_week_count=week_count or 0
     )
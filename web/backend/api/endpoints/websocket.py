@@ -3,40 +3,134 @@ WebSocket API 端点
 """
 
 from fastapi import APIRouter, WebSocket, WebSocketDisconnect
-from typing import Dict
-import json
+from typing import Dict, Optional
+import asyncio
 import logging
+import time
+
+import orjson
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter(tags=["websocket"])
 
+# 每个连接发送队列的上限；队列满说明客户端消费太慢，直接断开该连接
+SEND_QUEUE_SIZE = 100
+
+# 心跳：每隔 HEARTBEAT_INTERVAL 秒向所有连接发送 ping，超过 HEARTBEAT_TIMEOUT 秒没有收到任何消息的连接被清理
+HEARTBEAT_INTERVAL = 30
+HEARTBEAT_TIMEOUT = 90
+
+
+def encode_message(message: dict) -> bytes:
+    """把消息编码为 UTF-8 JSON；广播时只编码一次，所有连接共用同一个 bytes 对象"""
+    return orjson.dumps(message)
+
+
+class ConnEntry:
+    """单个连接：发送队列和负责发送的后台任务"""
+    
+    def __init__(self, websocket: WebSocket):
+        self.websocket = websocket
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=SEND_QUEUE_SIZE)
+        self.writer_task: Optional[asyncio.Task] = None
+        self.last_seen = time.monotonic()
+
+
 # 简单的连接管理器
 class ConnectionManager:
+    """
+    每个连接都有自己的发送队列，由独立的 writer 任务逐条发送。
+    广播只是把消息放入各个队列，慢客户端只会阻塞自己的队列。
+    """
+    
     def __init__(self):
-        self.active_connections: Dict[str, WebSocket] = {}
+        self.active_connections: Dict[str, ConnEntry] = {}
     
     async def connect(self, websocket: WebSocket, client_id: str):
         await websocket.accept()
-        self.active_connections[client_id] = websocket
+        entry = ConnEntry(websocket)
+        entry.writer_task = asyncio.create_task(self._writer(client_id, entry))
+        self.active_connections[client_id] = entry
         logger.info(f"WebSocket连接: {client_id}")
     
     def disconnect(self, client_id: str):
-        if client_id in self.active_connections:
-            del self.active_connections[client_id]
+        entry = self.active_connections.pop(client_id, None)
+        if entry is not None:
+            if entry.writer_task is not None:
+                entry.writer_task.cancel()
             logger.info(f"WebSocket断开: {client_id}")
     
+    async def _writer(self, client_id: str, entry: ConnEntry):
+        """逐条发送队列中的消息"""
+        try:
+            while True:
+                payload = await entry.queue.get()
+                await entry.websocket.send_bytes(payload)
+        except asyncio.CancelledError:
+            # 已被移出连接表（客户端断开或队列积压），关闭连接让接收循环退出
+            try:
+                await entry.websocket.close()
+            except Exception:
+                pass
+            raise
+        except Exception:
+            # 发送失败：只移除连接表中的记录，不能取消正在运行的本任务，关闭连接后直接返回
+            if self.active_connections.get(client_id) is entry:
+                del self.active_connections[client_id]
+                logger.info(f"WebSocket断开: {client_id}")
+            try:
+                await entry.websocket.close()
+            except Exception:
+                pass
+    
+    def touch(self, client_id: str):
+        """收到客户端消息时刷新活跃时间"""
+        entry = self.active_connections.get(client_id)
+        if entry is not None:
+            entry.last_seen = time.monotonic()
+    
+    async def heartbeat(self):
+        """定期清理无响应的连接并发送 ping，应用启动时作为后台任务运行"""
+        while True:
+            await asyncio.sleep(HEARTBEAT_INTERVAL)
+            now = time.monotonic()
+            stale_clients = [
+                client_id
+                for client_id, entry in self.active_connections.items()
+                if now - entry.last_seen > HEARTBEAT_TIMEOUT
+            ]
+            for client_id in stale_clients:
+                logger.info(f"WebSocket心跳超时: {client_id}")
+                self.disconnect(client_id)
+            
+            await self.broadcast({"type": "ping"})
+    
+    def _enqueue(self, client_id: str, entry: ConnEntry, payload: bytes) -> bool:
+        try:
+            entry.queue.put_nowait(payload)
+            return True
+        except asyncio.QueueFull:
+            logger.warning(f"WebSocket发送队列已满，断开连接: {client_id}")
+            return False
+    
+    def send(self, client_id: str, message: dict):
+        """给单个连接发送消息"""
+        entry = self.active_connections.get(client_id)
+        if entry is not None and not self._enqueue(client_id, entry, encode_message(message)):
+            self.disconnect(client_id)
+    
     async def broadcast(self, message: dict):
         """广播消息给所有连接"""
-        disconnected = []
-        for client_id, connection in self.active_connections.items():
-            try:
-                await connection.send_text(json.dumps(message))
-            except:
-                disconnected.append(client_id)
+        payload = encode_message(message)
+        slow_clients = [
+            client_id
+            for client_id, entry in self.active_connections.items()
+            if not self._enqueue(client_id, entry, payload)
+        ]
         
-        # 清理断开的连接
-        for client_id in disconnected:
+        # 清理积压的连接
+        for client_id in slow_clients:
             self.disconnect(client_id)
 
 manager = ConnectionManager()
@@ -51,19 +145,20 @@ async def websocket_endpoint(websocket: WebSocket):
         await manager.connect(websocket, client_id)
         
         # 发送欢迎消息
-        await websocket.send_text(json.dumps({
+        manager.send(client_id, {
             "type": "welcome",
             "message": "连接成功"
-        }))
+        })
         
         # 保持连接
         while True:
             data = await websocket.receive_text()
-            message = json.loads(data)
+            message = orjson.loads(data)
+            manager.touch(client_id)
             
             # 处理ping
             if message.get("type") == "ping":
-                await websocket.send_text(json.dumps({"type": "pong"}))
+                manager.send(client_id, {"type": "pong"})
     
     except WebSocketDisconnect:
         manager.disconnect(client_id)
@@ -4,10 +4,11 @@
 
 from datetime import datetime, timedelta
 from typing import Optional
+import functools
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from jose import JWTError, jwt
-from passlib.context import CryptContext
+import bcrypt
 import os
 
 # 配置
@@ -15,32 +16,31 @@ SECRET_KEY = os.getenv("SECRET_KEY", "your-secret-key-change-this-in-production"
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 60 * 24  # 24小时
 
-# 密码哈希
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
-
 # HTTP Bearer认证
 security = HTTPBearer()
 
+
+def verify_password(plain_password: str, hashed_password: str) -> bool:
+    """验证密码（bcrypt 计算较慢，异步接口中应放到线程池执行）"""
+    return bcrypt.checkpw(plain_password.encode("utf-8"), hashed_password.encode("utf-8"))
+
+
+def get_password_hash(password: str) -> str:
+    """生成密码哈希"""
+    return bcrypt.hashpw(password.encode("utf-8"), bcrypt.gensalt()).decode("utf-8")
+
+
 # 简单的用户存储（生产环境应该使用数据库）
 USERS_DB = {
     "testuser": {
         "username": "testuser",
-        "hashed_password": pwd_context.hash("testuser251024"),  # 默认密码
+        # 默认密码 testuser251024 的预先计算的哈希，避免每次导入模块时都运行一次 bcrypt
+        "hashed_password": "$2b$12$8XWAYcFsSKV4Ra4t9JhAFe4xKkhG2MtRV7GvUJiQNzZDEy.tL9gw2",
         "disabled": False,
     }
 }
 
 
-def verify_password(plain_password: str, hashed_password: str) -> bool:
-    """验证密码"""
-    return pwd_context.verify(plain_password, hashed_password)
-
-
-def get_password_hash(password: str) -> str:
-    """生成密码哈希"""
-    return pwd_context.hash(password)
-
-
 def authenticate_user(username: str, password: str) -> Optional[dict]:
     """验证用户"""
     user = USERS_DB.get(username)
@@ -66,8 +66,9 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
     return encoded_jwt
 
 
-def decode_token(token: str) -> Optional[dict]:
-    """解码令牌"""
+@functools.lru_cache(maxsize=4096)
+def _decode_cached(token: str) -> Optional[dict]:
+    # 令牌不设置过期时间，同一个令牌的解码结果不会变化，可以直接缓存
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
         return payload
@@ -75,6 +76,11 @@ def decode_token(token: str) -> Optional[dict]:
         return None
 
 
+def decode_token(token: str) -> Optional[dict]:
+    """解码令牌（结果按令牌缓存，调用方不应修改返回的字典）"""
+    return _decode_cached(token)
+
+
 async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)) -> dict:
     """获取当前用户（依赖注入）"""
     credentials_exception = HTTPException(
@@ -6,22 +6,44 @@ FastAPI 应用入口
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, ORJSONResponse
+from contextlib import asynccontextmanager
+import asyncio
 import os
 
-from database import engine, Base
+from database import async_engine, Base
+from models import QuizRecord
 from api.endpoints import quiz, stats, websocket, health, auth, chromadb
 from auth import get_current_user
 from fastapi import Depends
 
-# 创建数据库表
-Base.metadata.create_all(bind=engine)
+
+def create_schema(connection):
+    """创建数据库表；create_all 不会给已存在的表补建新索引，这里逐个检查补齐"""
+    Base.metadata.create_all(bind=connection)
+    for index in QuizRecord.__table__.indexes:
+        index.create(bind=connection, checkfirst=True)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """应用启动时初始化数据库并启动 WebSocket 心跳任务，关闭时停止心跳"""
+    async with async_engine.begin() as conn:
+        await conn.run_sync(create_schema)
+    
+    heartbeat_task = asyncio.create_task(websocket.manager.heartbeat())
+    yield
+    heartbeat_task.cancel()
+    await async_engine.dispose()
+
 
 # 创建 FastAPI 应用
 app = FastAPI(
     title="QuizGazer History API",
     description="QuizGazer 答题历史记录管理系统",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=ORJSONResponse,
+    lifespan=lifespan
 )
 
 # CORS 配置
@@ -66,33 +88,6 @@ async def login_page():
     else:
         raise HTTPException(status_code=404, detail="登录页面未找到")
 
-@app.get("/")
-async def root():
-    """根路径 - 重定向到前端页面"""
-    if os.path.exists(os.path.join(FRONTEND_DIR, "index.html")):
-        return FileResponse(os.path.join(FRONTEND_DIR, "index.html"))
-    else:
-        return {
-            "message": "QuizGazer History API",
-            "version": "1.0.0",
-            "docs": "/docs",
-            "frontend": "前端文件未找到，请检查 frontend 目录"
-        }
-
-@app.get("/app")
-async def frontend_app():
-    """前端应用入口"""
-    frontend_path = os.path.join(FRONTEND_DIR, "index.html")
-    if os.path.exists(frontend_path):
-        return FileResponse(frontend_path)
-    else:
-        return {"error": "前端文件未找到"}
-
-@app.get("/history")
-async def history_page():
-    """历史记录页面别名"""
-    return await frontend_app()
-
 @app.get("/chromadb")
 async def chromadb_page():
     """ChromaDB查询页面"""
@@ -102,63 +97,10 @@ async def chromadb_page():
     else:
         raise HTTPException(status_code=404, detail="ChromaDB页面未找到")
 
-# 静态文件服务 - 必须在最后，因为使用了通配符
-@app.get("/app.js")
-async def frontend_js():
-    """前端JS文件"""
-    js_path = os.path.join(FRONTEND_DIR, "app.js")
-    if os.path.exists(js_path):
-        return FileResponse(js_path, media_type="application/javascript")
-    else:
-        raise HTTPException(status_code=404, detail="JS文件未找到")
-
-@app.get("/login.js")
-async def login_js():
-    """登录页面JS文件"""
-    js_path = os.path.join(FRONTEND_DIR, "login.js")
-    if os.path.exists(js_path):
-        return FileResponse(js_path, media_type="application/javascript")
-    else:
-        raise HTTPException(status_code=404, detail="JS文件未找到")
-
-@app.get("/chromadb.js")
-async def chromadb_js():
-    """ChromaDB页面JS文件"""
-    js_path = os.path.join(FRONTEND_DIR, "chromadb.js")
-    if os.path.exists(js_path):
-        return FileResponse(js_path, media_type="application/javascript")
-    else:
-        raise HTTPException(status_code=404, detail="JS文件未找到")
-
-# 通用静态文件服务 - 必须在所有其他路由之后
-@app.get("/{filename}")
-async def serve_frontend_files(filename: str):
-    """服务前端静态文件"""
-    # 只允许特定的文件类型
-    allowed_extensions = ['.js', '.css', '.png', '.jpg', '.jpeg', '.gif', '.ico', '.svg']
-    
-    if any(filename.endswith(ext) for ext in allowed_extensions):
-        file_path = os.path.join(FRONTEND_DIR, filename)
-        if os.path.exists(file_path):
-            # 根据文件扩展名设置正确的媒体类型
-            media_type_map = {
-                '.js': 'application/javascript',
-                '.css': 'text/css',
-                '.png': 'image/png',
-                '.jpg': 'image/jpeg',
-                '.jpeg': 'image/jpeg',
-                '.gif': 'image/gif',
-                '.ico': 'image/x-icon',
-                '.svg': 'image/svg+xml'
-            }
-            
-            ext = next((ext for ext in allowed_extensions if filename.endswith(ext)), '.js')
-            media_type = media_type_map.get(ext, 'application/octet-stream')
-            
-            return FileResponse(file_path, media_type=media_type)
-    
-    # 如果不是静态文件，返回404
-    raise HTTPException(status_code=404, detail="File not found")
+# 前端静态文件（index.html、js、css 等）交给 StaticFiles 处理，
+# 它会返回 ETag/Last-Modified 以支持 304；必须在所有其他路由之后挂载
+if os.path.isdir(FRONTEND_DIR):
+    app.mount("/", StaticFiles(directory=FRONTEND_DIR, html=True), name="frontend")
 
 if __name__ == "__main__":
     import uvicorn
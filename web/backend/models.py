@@ -2,7 +2,7 @@
 数据模型定义
 """
 
-from sqlalchemy import Column, Integer, String, Text, DateTime, Float
+from sqlalchemy import Column, Integer, String, Text, DateTime, Float, Index
 from datetime import datetime
 from database import Base
 
@@ -34,21 +34,23 @@ class QuizRecord(Base):
     image_size = Column(String(20))
     confidence_score = Column(Float)
 
+    # 列表按 (timestamp, id) 倒序做游标分页，复合索引让翻页直接定位；
+    # 按用户筛选时 (user_id, timestamp) 索引同时满足过滤和排序
+    __table_args__ = (
+        Index("ix_quiz_records_timestamp_id", timestamp.desc(), id.desc()),
+        Index("ix_quiz_records_user_timestamp", user_id, timestamp.desc()),
+    )
+
+    # to_dict 输出的字段，顺序与接口返回一致
+    _COLUMNS = (
+        "id", "timestamp", "image_path", "question_text", "answer_text",
+        "vlm_model", "llm_model", "ocr_time", "answer_time", "total_time",
+        "user_id", "session_id", "image_size", "confidence_score",
+    )
+
     def to_dict(self):
         """转换为字典"""
-        return {
-            "id": self.id,
-            "timestamp": self.timestamp.isoformat() if self.timestamp else None,
-            "image_path": self.image_path,
-            "question_text": self.question_text,
-            "answer_text": self.answer_text,
-            "vlm_model": self.vlm_model,
-            "llm_model": self.llm_model,
-            "ocr_time": self.ocr_time,
-            "answer_time": self.answer_time,
-            "total_time": self.total_time,
-            "user_id": self.user_id,
-            "session_id": self.session_id,
-            "image_size": self.image_size,
-            "confidence_score": self.confidence_score
-        }
+        data = {name: getattr(self, name) for name in self._COLUMNS}
+        if self.timestamp:
+            data["timestamp"] = self.timestamp.isoformat()
+        return data
@@ -40,9 +40,11 @@ class QuizRecordResponse(QuizRecordBase):
 class QuizRecordList(BaseModel):
     """测验记录列表"""
     records: List[QuizRecordResponse]
-    total: int
-    page: int
-    pages: int
+    # 游标翻页时不统计总数，以下三项为 None
+    total: Optional[int] = None
+    page: Optional[int] = None
+    pages: Optional[int] = None
+    next_cursor: Optional[str] = None
 
 
 class StatsResponse(BaseModel):
@@ -349,10 +349,13 @@ const app = createApp({
         };
 
         // WebSocket连接
+        const wsDecoder = new TextDecoder('utf-8');
         const connectWebSocket = () => {
             try {
                 const wsUrl = API_BASE_URL.replace('http', 'ws') + '/ws';
                 websocket = new WebSocket(wsUrl);
+                // 服务端以二进制帧发送 UTF-8 JSON
+                websocket.binaryType = 'arraybuffer';
 
                 websocket.onopen = () => {
                     console.log('WebSocket连接成功');
@@ -361,7 +364,10 @@ const app = createApp({
 
                 websocket.onmessage = (event) => {
                     try {
-                        const message = JSON.parse(event.data);
+                        const text = typeof event.data === 'string'
+                            ? event.data
+                            : wsDecoder.decode(event.data);
+                        const message = JSON.parse(text);
                         handleWebSocketMessage(message);
                     } catch (error) {
                         console.error('WebSocket消息解析失败:', error);
@@ -386,6 +392,14 @@ const app = createApp({
 
         // 处理WebSocket消息
         const handleWebSocketMessage = (message) => {
+            // 服务端心跳，回复 pong 表示连接仍然可用
+            if (message.type === 'ping') {
+                if (websocket && websocket.readyState === WebSocket.OPEN) {
+                    websocket.send(JSON.stringify({ type: 'pong' }));
+                }
+                return;
+            }
+
             console.log('收到WebSocket消息:', message);
 
             if (message.type === 'new_record') {
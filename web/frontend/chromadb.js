@@ -114,6 +114,29 @@ const app = createApp({
             }
         };
 
+        // 后台加载各集合的文档数；远程 ChromaDB 上统计较慢，不阻塞列表显示
+        const loadCollectionCounts = async () => {
+            try {
+                const response = await fetch(`${API_BASE_URL}/api/chromadb/collections?with_counts=true`, {
+                    headers: getAuthHeaders()
+                });
+
+                if (!response.ok) return;
+
+                const data = await response.json();
+                const counts = {};
+                (data.collections || []).forEach(col => {
+                    counts[col.name] = col.count;
+                });
+                collections.value = collections.value.map(col => ({
+                    ...col,
+                    count: counts[col.name]
+                }));
+            } catch (error) {
+                console.error('加载集合文档数失败:', error);
+            }
+        };
+
         // 加载集合列表
         const loadCollections = async () => {
             if (!checkAuth()) return;
@@ -134,6 +157,7 @@ const app = createApp({
                 
                 if (collections.value.length > 0) {
                     ElMessage.success(`加载了 ${collections.value.length} 个集合`);
+                    loadCollectionCounts();
                 } else {
                     ElMessage.warning('未找到任何集合');
                 }